@@ -0,0 +1,116 @@
+"""Сравнение запросов к API без пула соединений и через общую сессию.
+
+Запуск из корня проекта:
+    python benchmarks/bench_http_session.py --requests 300
+
+Поднимает локальный HTTPS-сервер с самоподписанным сертификатом
+в отдельном процессе и измеряет задержку одного запроса и процессорное
+время клиента для `requests.get` и для `homework.init_http_session()`.
+"""
+import argparse
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+
+BODY = json.dumps({'homeworks': [], 'current_date': 0}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Отвечает пустым списком работ с поддержкой keep-alive."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_certificate(directory: str) -> tuple:
+    """Создаёт самоподписанный сертификат для 127.0.0.1."""
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+         '-keyout', key, '-out', cert, '-days', '1',
+         '-subj', '/CN=127.0.0.1',
+         '-addext', 'subjectAltName=IP:127.0.0.1'],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+def serve(cert: str, key: str, port: int) -> None:
+    """Запускает HTTPS-заглушку API."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.serve_forever()
+
+
+def measure(count: int) -> tuple:
+    """Возвращает задержки запросов и процессорное время клиента."""
+    latencies = []
+    cpu_started = time.process_time()
+    for _ in range(count):
+        started = time.perf_counter()
+        homework.get_api_answer(1)
+        latencies.append(time.perf_counter() - started)
+    return latencies, time.process_time() - cpu_started
+
+
+def report(name: str, latencies: list, cpu: float) -> None:
+    """Печатает итоги одного прогона."""
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f'{name:<12} p50={statistics.median(latencies) * 1000:.2f}ms '
+        f'p99={p99 * 1000:.2f}ms '
+        f'cpu/request={cpu / len(latencies) * 1000:.2f}ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--port', type=int, default=8443)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        server = Process(target=serve, args=(cert, key, args.port))
+        server.start()
+        time.sleep(0.5)
+        os.environ['REQUESTS_CA_BUNDLE'] = cert
+        homework.ENDPOINT = f'https://127.0.0.1:{args.port}/'
+        homework.PRACTICUM_TOKEN = 'benchmark'
+        try:
+            homework.HTTP_SESSION = None
+            report('requests.get', *measure(args.requests))
+            homework.init_http_session()
+            report('session', *measure(args.requests))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == '__main__':
+    main()
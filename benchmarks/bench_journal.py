@@ -0,0 +1,54 @@
+"""Стоимость журнала уведомлений: fsync на каждую запись и на пачку.
+
+Запуск из корня проекта:
+    python benchmarks/bench_journal.py --notifications 2000
+
+Записывает уведомления и подтверждения в журнал во временном каталоге
+и печатает время на одно уведомление при fsync после каждой записи и
+при групповой записи пачками разного размера.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal import NotificationJournal  # noqa: E402
+
+BATCH_SIZES = (1, 10, 100, 1000)
+
+
+def run(path: str, notifications: int, batch: int) -> float:
+    journal = NotificationJournal(path)
+    journal.load()
+    started = time.perf_counter()
+    for index in range(notifications):
+        entry = journal.record(
+            (f'sub{index % 100}', index, 'approved'), index % 100,
+            'Изменился статус проверки работы "hw". '
+            'Работа проверена: ревьюеру всё понравилось. Ура!'
+        )
+        journal.ack(entry.seq)
+        if (index + 1) % batch == 0:
+            journal.flush()
+    journal.close()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notifications', type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for batch in BATCH_SIZES:
+            path = os.path.join(directory, f'journal-{batch}')
+            elapsed = run(path, args.notifications, batch)
+            per_item = elapsed / args.notifications * 1e6
+            print(f'пачка {batch:>5}: {per_item:8.1f} мкс на уведомление,'
+                  f' {args.notifications / elapsed:9.0f} уведомлений/с')
+
+
+if __name__ == '__main__':
+    main()
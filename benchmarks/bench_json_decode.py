@@ -0,0 +1,77 @@
+"""Микробенчмарк разбора ответов API с большой историей работ.
+
+Запуск из корня проекта:
+    python benchmarks/bench_json_decode.py --homeworks 50 500 5000
+
+Для каждого декодера (json, orjson если установлен) в полном и экономном
+режиме печатает время разбора одного ответа и объём памяти, который
+занимает результат.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import decoding  # noqa: E402
+
+
+def make_body(count: int) -> bytes:
+    """Создаёт ответ API с count работами."""
+    homeworks = [
+        {
+            'id': index,
+            'status': ('approved', 'rejected', 'reviewing')[index % 3],
+            'homework_name': f'student__hw{index:05d}.zip',
+            'reviewer_comment': 'Есть замечания по коду. ' * 20,
+            'date_updated': '2022-02-13T14:40:57Z',
+            'lesson_name': f'Спринт {index % 20}: итоговый проект'
+        }
+        for index in range(count)
+    ]
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': 1644763257},
+        ensure_ascii=False
+    ).encode()
+
+
+def retained_memory(body: bytes, lean: bool) -> int:
+    """Возвращает объём памяти, занятой результатом разбора."""
+    tracemalloc.start()
+    data = decoding.loads(body, lean)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[50, 500, 5000]
+    )
+    args = parser.parse_args()
+
+    backends = ['json'] + (['orjson'] if decoding.orjson else [])
+    for count in args.homeworks:
+        body = make_body(count)
+        print(f'{count} работ, {len(body) / 1024:.0f} КБ')
+        for backend in backends:
+            decoding.JSON_BACKEND = backend
+            for lean in (False, True):
+                runs = max(3, 20000 // count)
+                seconds = timeit.timeit(
+                    lambda: decoding.loads(body, lean), number=runs
+                ) / runs
+                name = f'{backend}{" lean" if lean else ""}'
+                print(
+                    f'  {name:<12} {seconds * 1000:8.3f} мс'
+                    f' {retained_memory(body, lean) / 1024:8.0f} КБ'
+                )
+
+
+if __name__ == '__main__':
+    main()
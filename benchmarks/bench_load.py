@@ -0,0 +1,128 @@
+"""Нагрузочный бенчмарк движка опроса на локальных заглушках.
+
+Запуск из корня проекта:
+    python benchmarks/bench_load.py --subscriptions 500 --duration 30
+
+Запускает PollingEngine с N подписками против заглушек API Практикума
+и Bot API (benchmarks/stubs.py) и печатает число опросов в секунду,
+долю запросов, схлопнутых у подписок одного токена (--chats-per-token),
+пиковую частоту запросов к API и их задержку общим лимитом (--api-rate,
+--api-burst; по умолчанию лимит отключён),
+p50/p99 задержки уведомления от смены статуса до получения сообщения,
+процессорное время и пиковый RSS процесса бота.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscriptions', type=int, default=200)
+    parser.add_argument('--chats-per-token', type=int, default=1,
+                        help='сколько чатов следят за одним токеном')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--interval', type=float, default=2,
+                        help='обычный интервал опроса, секунды')
+    parser.add_argument('--change-interval', type=float, default=5)
+    parser.add_argument('--payload-size', type=int, default=10)
+    parser.add_argument('--api-latency', type=float, default=0.01)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.01)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument('--api-rate', type=float, default=0,
+                        help='общий лимит запросов к API в секунду')
+    parser.add_argument('--api-burst', type=float, default=20)
+    return parser.parse_args()
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault('POLL_MIN_INTERVAL', str(args.interval / 4))
+    os.environ.setdefault('BACKOFF_BASE', str(args.interval))
+    os.environ.setdefault('TELEGRAM_CHAT_RATE', '100')
+    os.environ.setdefault('TELEGRAM_GLOBAL_RATE', '10000')
+
+    from stubs import StubConfig, start_stubs
+
+    process, port = start_stubs(StubConfig(
+        api_latency=args.api_latency,
+        api_error_rate=args.api_error_rate,
+        payload_size=args.payload_size,
+        change_interval=args.change_interval,
+        telegram_latency=args.telegram_latency,
+        telegram_error_rate=args.telegram_error_rate,
+    ))
+    base_url = f'http://127.0.0.1:{port}'
+
+    import engine
+    import fingerprint
+    import homework
+
+    homework.ENDPOINT = f'{base_url}/api/user_api/homework_statuses/'
+    homework.TELEGRAM_TOKEN = '1234:benchmark'
+    homework.RETRY_TIME = args.interval
+    homework.init_http_session()
+    bot = homework.create_bot(base_url=f'{base_url}/bot')
+    subscriptions = [
+        engine.Subscription(
+            f'token{index // args.chats_per_token}', index + 1
+        )
+        for index in range(args.subscriptions)
+    ]
+    polling = engine.PollingEngine(
+        bot, subscriptions, api_rate=args.api_rate, api_burst=args.api_burst
+    )
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_started = usage.ru_utime + usage.ru_stime
+    started = time.perf_counter()
+    try:
+        asyncio.run(asyncio.wait_for(polling.run(), args.duration))
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    with urllib.request.urlopen(f'{base_url}/stats') as response:
+        stats = json.load(response)
+    process.terminate()
+
+    latencies = stats['latencies']
+    print(f'подписок: {args.subscriptions}, длительность: {elapsed:.1f} с')
+    print(f'опросов в секунду: {stats["polls"] / elapsed:.1f}'
+          f' (ошибок API: {stats["api_errors"]})')
+    flights = fingerprint.FLIGHTS.stats()
+    print(f'схлопнуто запросов: {flights["coalesced"]}'
+          f' из {flights["executed"] + flights["coalesced"]}'
+          f' ({flights["ratio"]:.0%})')
+    quota_delays = [state.quota_delay for state in polling.states.values()]
+    print(f'пиковая частота запросов к API: {stats["peak_rps"]} в секунду,'
+          f' задержка лимитом p50: {percentile(quota_delays, 0.5):.3f} с,'
+          f' max: {percentile(quota_delays, 1):.3f} с')
+    print(f'уведомлений: {stats["messages"]}'
+          f' (ошибок Telegram: {stats["telegram_errors"]})')
+    print(f'задержка уведомления p50: {percentile(latencies, 0.5):.3f} с,'
+          f' p99: {percentile(latencies, 0.99):.3f} с')
+    print(f'CPU: {usage.ru_utime + usage.ru_stime - cpu_started:.2f} с,'
+          f' пиковый RSS: {usage.ru_maxrss / 1024:.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Накладные расходы логирования на один цикл опроса.
+
+Запуск из корня проекта:
+    python benchmarks/bench_logging.py --cycles 20000
+
+Повторяет записи, которые делает один цикл опроса и отправки, и печатает
+время, потраченное в вызывающем потоке, для синхронной записи в файлы,
+очереди с QueueListener, очереди с семплированием и JSON-формата.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logconfig  # noqa: E402
+
+VARIANTS = (
+    ('sync', dict(mode='sync', log_format='text', sample_rate=1)),
+    ('queue', dict(mode='queue', log_format='text', sample_rate=1)),
+    ('queue+sample10', dict(mode='queue', log_format='text', sample_rate=10)),
+    ('queue+json', dict(mode='queue', log_format='json', sample_rate=1)),
+    ('sync level=WARNING', dict(
+        mode='sync', log_format='text', sample_rate=1, level='WARNING'
+    )),
+)
+
+
+def cycle(logger: logging.Logger, index: int) -> None:
+    """Записи одного цикла опроса и отправки сообщения."""
+    logger.info('Запрашиваем данные API у %s', 'https://practicum.yandex.ru')
+    logger.info('Начинаем проверять ответ API')
+    logger.info('Начинаем отправку сообщения в чат %s', index)
+    logger.info('Сообщение успешно отправлено в чат %s', index)
+
+
+def reset_root() -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=20000)
+    args = parser.parse_args()
+    logger = logging.getLogger('homework')
+
+    for name, options in VARIANTS:
+        with tempfile.TemporaryDirectory() as directory:
+            options = {'level': 'DEBUG', **options}
+            listener = logconfig.setup_logging(log_dir=directory, **options)
+            started = time.perf_counter()
+            for index in range(args.cycles):
+                cycle(logger, index)
+            elapsed = time.perf_counter() - started
+            if listener:
+                listener.stop()
+                for handler in listener.handlers:
+                    handler.close()
+            reset_root()
+            print(f'{name:<20} {elapsed / args.cycles * 1e6:8.1f} мкс/цикл')
+
+
+if __name__ == '__main__':
+    main()
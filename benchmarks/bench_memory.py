@@ -0,0 +1,89 @@
+"""Память на одну подписку: состояние опроса и очередь уведомлений.
+
+Запуск из корня проекта:
+    python benchmarks/bench_memory.py --subscriptions 100000 --homeworks 10
+
+Создаёт движок с N подписками, восстанавливает им состояние с K работами
+и их названиями из разобранного JSON, как после чтения из хранилища,
+затем ставит в очередь по одному уведомлению о смене статуса на подписку
+и печатает прирост RSS процесса на подписку после каждого шага.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+def rss() -> int:
+    """Текущий RSS процесса в байтах."""
+    gc.collect()
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def saved_statuses(index: int, homeworks: int) -> dict:
+    # Строки из json.loads и из SQLite каждый раз новые объекты.
+    return {
+        index * homeworks + number: status
+        for number, status in json.loads(json.dumps([
+            [number, STATUSES[number % len(STATUSES)]]
+            for number in range(homeworks)
+        ]))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscriptions', type=int, default=100000)
+    parser.add_argument('--homeworks', type=int, default=10)
+    args = parser.parse_args()
+    count = args.subscriptions
+
+    started = rss()
+    subscriptions = [
+        engine.Subscription(f'y0_token{index:08d}', 100000 + index)
+        for index in range(count)
+    ]
+    polling = engine.PollingEngine(None, subscriptions, serve_http=False)
+    created = rss()
+    for index, subscription in enumerate(subscriptions):
+        statuses = saved_statuses(index, args.homeworks)
+        polling.new_state(subscription, 0, statuses, {
+            key: f'student{index}__hw{key % args.homeworks:02d}.zip'
+            for key in statuses
+        })
+    restored = rss()
+
+    async def notify() -> None:
+        for index, subscription in enumerate(subscriptions):
+            await polling.process_homeworks(
+                subscription, polling.states[subscription.key],
+                [{
+                    'id': index * args.homeworks,
+                    'homework_name': f'student{index}__hw05_final.zip',
+                    'status': 'approved',
+                }]
+            )
+
+    asyncio.run(notify())
+    queued = rss()
+
+    print(f'подписок: {count}, работ в подписке: {args.homeworks}')
+    print(f'подписки и движок: {(created - started) / count:7.0f} байт'
+          ' на подписку')
+    print(f'состояние опроса:  {(restored - created) / count:7.0f} байт'
+          ' на подписку')
+    print(f'уведомление в очереди: {(queued - restored) / count:7.0f} байт')
+    print(f'всего: {(queued - started) / 2 ** 20:.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Проигрывание записанного трафика API через движок опроса.
+
+Запуск из корня проекта:
+    python benchmarks/bench_replay.py traffic.rec.gz --speed 60 --profile
+
+Запись делает бот, запущенный с RECORD_FILE=traffic.rec.gz. Ответы API
+подаются в движок без сети и без Telegram, быстрее записи в --speed раз
+(0 — без пауз). Печатает время и скорость проигрывания, а также сверку
+уведомлений с записанными отправками: missing — записанные сообщения,
+которых не было при проигрывании, extra — лишние. Сводки ошибок, сообщения
+разомкнутого предохранителя и ответы на команды бота не проигрываются
+и попадают в missing. С --profile
+печатает 20 самых дорогих функций.
+"""
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recording import Replayer, load_recording  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=0)
+    parser.add_argument('--profile', action='store_true')
+    args = parser.parse_args()
+
+    records = load_recording(args.path)
+    replayer = Replayer(records, speed=args.speed)
+    profile = cProfile.Profile() if args.profile else None
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    if profile:
+        profile.enable()
+    report = asyncio.run(replayer.run())
+    if profile:
+        profile.disable()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    span = records[-1]['at'] - records[0]['at'] if records else 0
+    print(f'событий: {len(records)}, записано за {span:.0f} с, '
+          f'проиграно за {elapsed:.2f} с, CPU {cpu:.2f} с')
+    print(f'опросов: {report["polls"]} '
+          f'({report["polls"] / elapsed if elapsed else 0:.0f} в секунду)')
+    print(f'уведомлений: {report["replayed"]}, '
+          f'в записи: {report["recorded"]}, '
+          f'missing: {report["missing"]}, extra: {report["extra"]}, '
+          f'расхождений from_date: {report["from_date_mismatches"]}')
+    if profile:
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(20)
+
+
+if __name__ == '__main__':
+    main()
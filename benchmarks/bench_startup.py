@@ -0,0 +1,175 @@
+"""Время запуска бота: импорты и время до первого опроса.
+
+Запуск из корня проекта:
+    python benchmarks/bench_startup.py --runs 5
+
+Запускает бота в отдельном интерпретаторе с `python -X importtime` и
+печатает медиану по нескольким запускам:
+- время до выхода при неудачной проверке токенов и суммарное время
+  импортов в этом случае;
+- время от старта процесса до первого запроса к заглушке API Практикума
+  (benchmarks/stubs.py).
+Вариант eager заранее импортирует requests и telegram, как делал бот до
+перехода на ленивую загрузку, и показывает, сколько она экономит.
+Флаг --top печатает самые долгие импорты последнего запуска.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+HEAVY_MODULES = ('requests', 'telegram')
+
+BOOTSTRAP = '''
+import sys
+sys.path.insert(0, {root!r})
+{preload}
+from logconfig import setup_logging
+setup_logging()
+import homework
+homework.ENDPOINT = {endpoint!r}
+homework.main()
+'''
+
+VARIANTS = (
+    ('lazy', ''),
+    ('eager', 'import requests, telegram'),
+)
+
+
+def parse_importtime(stderr: str) -> list:
+    """Возвращает (модуль, собственное время, суммарное время) в секундах."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append(
+            (name.rstrip(), int(own) / 1e6, int(cumulative) / 1e6)
+        )
+    return imports
+
+
+def total_import_time(imports: list) -> float:
+    """Сумма времени импортов верхнего уровня."""
+    return sum(
+        cumulative for name, _, cumulative in imports
+        if not name.startswith('  ')
+    )
+
+
+def loaded(imports: list, module: str) -> bool:
+    return any(name.strip() == module for name, _, _ in imports)
+
+
+def bot_env(workdir: str, **tokens) -> dict:
+    env = {
+        'PATH': os.environ.get('PATH', ''),
+        'STATE_DB': '',
+        'LOG_DIR': workdir,
+    }
+    env.update(tokens)
+    return env
+
+
+def run_failed_check(workdir: str, preload: str) -> tuple:
+    """Запускает бота без токенов и ждёт выхода."""
+    code = BOOTSTRAP.format(root=ROOT, preload=preload, endpoint='')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=workdir, env=bot_env(workdir), capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    return elapsed, parse_importtime(result.stderr)
+
+
+def polls(base_url: str) -> int:
+    with urllib.request.urlopen(f'{base_url}/stats') as response:
+        return json.load(response)['polls']
+
+
+def run_first_poll(workdir: str, preload: str, base_url: str) -> tuple:
+    """Запускает бота и ждёт первого запроса к заглушке API."""
+    code = BOOTSTRAP.format(
+        root=ROOT, preload=preload,
+        endpoint=f'{base_url}/api/user_api/homework_statuses/'
+    )
+    env = bot_env(
+        workdir, PRACTICUM_TOKEN='startup', TELEGRAM_TOKEN='1234:benchmark',
+        TELEGRAM_CHAT_ID='1'
+    )
+    before = polls(base_url)
+    stderr = tempfile.TemporaryFile(mode='w+')
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr
+    )
+    try:
+        while polls(base_url) == before:
+            if process.poll() is not None:
+                raise RuntimeError('Бот завершился до первого опроса')
+            time.sleep(0.002)
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+    stderr.seek(0)
+    return elapsed, parse_importtime(stderr.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0,
+                        help='напечатать N самых долгих импортов')
+    args = parser.parse_args()
+
+    from stubs import StubConfig, start_stubs
+
+    process, port = start_stubs(StubConfig(change_interval=3600))
+    base_url = f'http://127.0.0.1:{port}'
+    imports: list = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for variant, preload in VARIANTS:
+                exits, import_times, first_polls = [], [], []
+                for _ in range(args.runs):
+                    elapsed, imports = run_failed_check(workdir, preload)
+                    exits.append(elapsed)
+                    import_times.append(total_import_time(imports))
+                    heavy = [
+                        module for module in HEAVY_MODULES
+                        if loaded(imports, module)
+                    ]
+                    elapsed, _ = run_first_poll(workdir, preload, base_url)
+                    first_polls.append(elapsed)
+                print(
+                    f'{variant:>5}: выход без токенов'
+                    f' {statistics.median(exits) * 1000:.0f} мс'
+                    f' (импорты {statistics.median(import_times) * 1000:.0f}'
+                    f' мс, загружены: {", ".join(heavy) or "—"}),'
+                    f' первый опрос'
+                    f' {statistics.median(first_polls) * 1000:.0f} мс'
+                )
+    finally:
+        process.terminate()
+    if args.top:
+        print(f'самые долгие импорты ({VARIANTS[-1][0]}, без токенов):')
+        for name, _, cumulative in sorted(
+            imports, key=lambda item: item[2], reverse=True
+        )[:args.top]:
+            print(f'{cumulative * 1000:8.1f} мс  {name.strip()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Локальные заглушки API Практикума и Bot API Telegram для бенчмарков.
+
+Заглушки запускаются в отдельном процессе, чтобы их работа не попадала
+в замеры процессорного времени бота. Статус работы каждого токена
+меняется по расписанию раз в `change_interval` секунд, а заглушка
+Telegram по тексту сообщения находит время смены статуса и считает
+задержку уведомления.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process, Queue
+from urllib.parse import parse_qs, urlsplit
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+REVIEWER_COMMENT = 'Есть замечания по коду. ' * 10
+
+
+class StubConfig:
+    """Параметры заглушек."""
+
+    def __init__(self, api_latency: float = 0.0, api_error_rate: float = 0.0,
+                 payload_size: int = 10, change_interval: float = 5.0,
+                 telegram_latency: float = 0.0,
+                 telegram_error_rate: float = 0.0) -> None:
+        self.api_latency = api_latency
+        self.api_error_rate = api_error_rate
+        self.payload_size = payload_size
+        self.change_interval = change_interval
+        self.telegram_latency = telegram_latency
+        self.telegram_error_rate = telegram_error_rate
+
+
+class StubState:
+    """Общее состояние заглушек внутри их процесса."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.polls_per_second: dict = {}
+        self.api_errors = 0
+        self.messages = 0
+        self.telegram_errors = 0
+        self.latencies: list = []
+
+    def _phase(self, token: str) -> float:
+        interval = self.config.change_interval
+        return zlib.crc32(token.encode()) % 1000 / 1000 * interval
+
+    def version(self, token: str, now: float) -> int:
+        """Номер текущей смены статуса работы токена."""
+        return int(
+            (now - self.started + self._phase(token))
+            // self.config.change_interval
+        )
+
+    def changed_at(self, token: str, version: int) -> float:
+        """Время, когда статус работы токена сменился на version."""
+        return (
+            self.started - self._phase(token)
+            + version * self.config.change_interval
+        )
+
+    def homeworks(self, token: str) -> dict:
+        now = time.time()
+        version = self.version(token, now)
+        current = {
+            'id': 0,
+            'homework_name': f'{token}|{version}',
+            'status': STATUSES[version % len(STATUSES)],
+            'reviewer_comment': REVIEWER_COMMENT,
+            'date_updated': '2022-02-13T14:40:57Z',
+            'lesson_name': 'Итоговый проект',
+        }
+        history = [
+            {**current, 'id': index, 'homework_name': f'old{index}',
+             'status': 'approved'}
+            for index in range(1, self.config.payload_size)
+        ]
+        return {'homeworks': [current] + history, 'current_date': int(now)}
+
+    def delivered(self, text: str) -> None:
+        """Считает задержку уведомления по имени работы в тексте."""
+        now = time.time()
+        try:
+            name = text.split('"')[1]
+            token, version = name.rsplit('|', 1)
+        except (IndexError, ValueError):
+            return
+        changed_at = self.changed_at(token, int(version))
+        if changed_at < self.started:
+            # Статус, известный до запуска, а не смена во время замера.
+            return
+        with self.lock:
+            self.latencies.append(max(now - changed_at, 0.0))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'polls': self.polls,
+                'peak_rps': max(self.polls_per_second.values(), default=0),
+                'api_errors': self.api_errors,
+                'messages': self.messages,
+                'telegram_errors': self.telegram_errors,
+                'latencies': list(self.latencies),
+            }
+
+
+def make_handler(state: StubState):
+    config = state.config
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def reply(self, status: int, data: dict) -> None:
+            body = json.dumps(data, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/stats':
+                self.reply(200, state.stats())
+                return
+            time.sleep(config.api_latency)
+            with state.lock:
+                state.polls += 1
+                second = int(time.time() - state.started)
+                state.polls_per_second[second] = (
+                    state.polls_per_second.get(second, 0) + 1
+                )
+                failed = random.random() < config.api_error_rate
+                state.api_errors += failed
+            if failed:
+                self.reply(500, {'error': 'stub'})
+                return
+            token = self.headers.get('Authorization', '').split(' ')[-1]
+            self.reply(200, state.homeworks(token))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length)
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                data = json.loads(raw or b'{}')
+            else:
+                data = {
+                    key: values[0]
+                    for key, values in parse_qs(raw.decode()).items()
+                }
+            time.sleep(config.telegram_latency)
+            if random.random() < config.telegram_error_rate:
+                with state.lock:
+                    state.telegram_errors += 1
+                self.reply(429, {
+                    'ok': False, 'error_code': 429,
+                    'description': 'Too Many Requests',
+                    'parameters': {'retry_after': 1}
+                })
+                return
+            with state.lock:
+                state.messages += 1
+            state.delivered(data.get('text', ''))
+            self.reply(200, {'ok': True, 'result': {
+                'message_id': state.messages,
+                'date': int(time.time()),
+                'chat': {'id': int(data.get('chat_id', 0)),
+                         'type': 'private'},
+                'text': data.get('text', ''),
+            }})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _serve(config: StubConfig, ports: Queue) -> None:
+    state = StubState(config)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    server.daemon_threads = True
+    # Бенчмарки завершают бота посреди запроса: обрыв соединения
+    # для заглушки не ошибка.
+    server.handle_error = lambda request, client_address: None
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stubs(config: StubConfig) -> tuple:
+    """Запускает заглушки в отдельном процессе и возвращает (процесс, порт).
+
+    Один сервер обслуживает оба API: GET — эндпоинт статусов работ,
+    POST — методы Bot API, GET /stats — собранная статистика.
+    """
+    ports: Queue = Queue()
+    process = Process(target=_serve, args=(config, ports), daemon=True)
+    process.start()
+    return process, ports.get(timeout=10)
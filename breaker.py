@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from http import HTTPStatus
+
+import metrics
+from exceptions import (CircuitOpenError, ConnectionError,
+                        WrongAPIResponseCodeError)
+
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 60))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv('BREAKER_HALF_OPEN_PROBES', 1))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_breaker_state',
+    'Состояние предохранителя: 0 — закрыт, 1 — пробный, 2 — открыт.',
+    ('endpoint',), aggregate='max'
+))
+BREAKER_TRANSITIONS = metrics.REGISTRY.register(metrics.Counter(
+    'homework_bot_breaker_transitions_total',
+    'Переходы предохранителя между состояниями.', ('endpoint', 'state')
+))
+
+
+def is_failure(error: BaseException) -> bool:
+    """Проверяет, что ошибка говорит о недоступности API.
+
+    Ответы 4xx, включая 429, значат, что сервер жив, и предохранитель
+    не размыкают. Ошибки вне запроса к API тоже не учитываются.
+    """
+    if not isinstance(error, ConnectionError):
+        return False
+    cause = error.__cause__
+    if isinstance(cause, WrongAPIResponseCodeError):
+        return (cause.status_code or 0) >= HTTPStatus.INTERNAL_SERVER_ERROR
+    return True
+
+
+class CircuitBreaker:
+    """Предохранитель с состояниями closed, open и half_open.
+
+    После threshold ошибок подряд размыкается и в течение reset_timeout
+    отвечает на вызовы CircuitOpenError без сетевого запроса. Затем
+    пропускает не больше probes пробных вызовов: успешный замыкает его,
+    неудачный снова размыкает.
+    """
+
+    def __init__(self, name: str,
+                 threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 probes: int = BREAKER_HALF_OPEN_PROBES,
+                 clock=time.monotonic) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trials = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(STATE_CODES[CLOSED], name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(
+            'Предохранитель %s: %s -> %s', self.name, self.state, state
+        )
+        self.state = state
+        BREAKER_STATE.set(STATE_CODES[state], self.name)
+        BREAKER_TRANSITIONS.inc(self.name, state)
+
+    def before_call(self) -> None:
+        """Пропускает вызов или сразу бросает CircuitOpenError."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_timeout - self._clock()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f'API {self.name} недоступно, запросы приостановлены',
+                        retry_after=remaining
+                    )
+                self._transition(HALF_OPEN)
+                self._trials = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.probes:
+                    raise CircuitOpenError(
+                        f'API {self.name} недоступно, запросы приостановлены',
+                        retry_after=self.reset_timeout
+                    )
+                self._trials += 1
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._transition(CLOSED)
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.threshold):
+                self.opened_at = self._clock()
+                self._transition(OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает func через предохранитель."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            if is_failure(error):
+                self.on_failure()
+            else:
+                self.on_success()
+            raise
+        self.on_success()
+        return result
+
+
+class PassThrough:
+    """Предохранитель, пропускающий все вызовы.
+
+    Нужен там, где запросы идут не в API, например при проигрывании
+    записи: недоступность API там уже отражена в записанных ответах.
+    """
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает func без проверок."""
+        return func(*args, **kwargs)
+
+
+_breakers: dict = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """Возвращает общий для процесса предохранитель адреса API."""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker(endpoint))
+    return breaker
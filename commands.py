@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import time
+
+from homework import HOMEWORK_VERDICT
+
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv('BOT_COMMANDS', '0') == '1'
+# Данные старше этого опрашиваются заново перед ответом на команду.
+COMMAND_MAX_AGE = float(os.getenv('COMMAND_MAX_AGE', 300))
+COMMAND_REFRESH_TIMEOUT = float(os.getenv('COMMAND_REFRESH_TIMEOUT', 10))
+# Время long polling getUpdates: меньше паузы между SIGTERM и SIGKILL.
+UPDATES_TIMEOUT = int(os.getenv('UPDATES_TIMEOUT', 10))
+UPDATES_RETRY_DELAY = 5.0
+
+HELP = (
+    'Команды:\n'
+    '/status — текущие статусы работ\n'
+    '/history — последние смены статусов'
+)
+NOT_SUBSCRIBED = 'Этот чат не подписан на статусы работ.'
+NO_STATUSES = 'Статусов работ пока нет.'
+NO_HISTORY = 'Смен статусов пока не было.'
+
+
+def parse_command(text: str):
+    """Возвращает команду из текста сообщения или None.
+
+    Команда может быть адресована боту: /status@homework_bot.
+    """
+    if not text or not text.startswith('/'):
+        return None
+    return text.split()[0].split('@')[0].lower()
+
+
+def _checked_ago(states: list, now: float) -> str:
+    checked = [state.polled_at for state in states if state.polled_at]
+    if len(checked) < len(states) or not checked:
+        return 'API ещё не опрашивался'
+    return f'Проверено {max(now - min(checked), 0) / 60:.0f} мин назад'
+
+
+def render_status(states: list, now: float = None) -> str:
+    """Текст ответа на /status по состояниям подписок чата."""
+    now = time.time() if now is None else now
+    lines: list = []
+    for state in states:
+        for key, status in state.tracker.statuses.items():
+            name = state.tracker.name(key)
+            lines.append(f'{name}: {HOMEWORK_VERDICT.get(status, status)}')
+    if not lines:
+        lines.append(NO_STATUSES)
+    lines.append(_checked_ago(states, now))
+    return '\n'.join(lines)
+
+
+def render_history(states: list) -> str:
+    """Текст ответа на /history: смены статусов по времени."""
+    events = sorted((
+        (changed_at, name, status)
+        for state in states
+        for changed_at, _, name, status in state.history or ()
+    ), key=lambda event: event[0])
+    if not events:
+        return NO_HISTORY
+    return '\n'.join(
+        f'{time.strftime("%d.%m %H:%M", time.localtime(changed_at))} '
+        f'{name}: {HOMEWORK_VERDICT.get(status, status)}'
+        for changed_at, name, status in events
+    )
+
+
+class CommandListener:
+    """Отвечает на команды чатов, получая их через getUpdates.
+
+    Ответ собирается из состояния подписок в памяти движка, без запроса
+    к API. Подписки, данные которых старше max_age, сначала опрашиваются
+    вне очереди. Ответы уходят через очередь отправки и соблюдают лимиты
+    Telegram.
+    """
+
+    def __init__(self, engine, max_age: float = COMMAND_MAX_AGE,
+                 timeout: int = UPDATES_TIMEOUT) -> None:
+        self.engine = engine
+        self.max_age = max_age
+        self.timeout = timeout
+        self.offset = None
+
+    async def answer(self, chat_id, command: str) -> str:
+        """Возвращает ответ на команду из чата."""
+        subscriptions = self.engine.find_subscriptions(chat_id=chat_id)
+        if not subscriptions:
+            return NOT_SUBSCRIBED
+        if command not in ('/status', '/history'):
+            return HELP
+        await asyncio.gather(*(
+            self.engine.refresh(
+                subscription, self.max_age, COMMAND_REFRESH_TIMEOUT
+            )
+            for subscription in subscriptions
+        ))
+        states = [
+            self.engine.states[subscription.key]
+            for subscription in subscriptions
+            if subscription.key in self.engine.states
+        ]
+        if command == '/status':
+            return render_status(states)
+        return render_history(states)
+
+    async def handle(self, update) -> None:
+        """Обрабатывает одно обновление Telegram."""
+        message = update.message
+        command = parse_command(message.text) if message else None
+        if command is None:
+            return
+        logger.info('Команда %s из чата %s', command, message.chat_id)
+        try:
+            reply = await self.answer(message.chat_id, command)
+        except Exception as error:
+            logger.error('Ошибка обработки команды: %s', error)
+            return
+        self.engine.outbox.put(message.chat_id, reply)
+
+    async def poll_updates(self) -> None:
+        """Получает одну пачку обновлений и отвечает на команды."""
+        updates = await self.engine._call(
+            self.engine.bot.get_updates, self.offset, 100, self.timeout
+        )
+        if updates:
+            self.offset = updates[-1].update_id + 1
+        # Команды пачки обрабатываются одновременно, чтобы внеочередной
+        # опрос для одного чата не задерживал ответы другим.
+        await asyncio.gather(*(self.handle(update) for update in updates))
+
+    async def run(self) -> None:
+        """Бесконечно получает обновления через long polling."""
+        logger.info('Бот принимает команды')
+        while True:
+            try:
+                await self.poll_updates()
+            except Exception as error:
+                logger.error('Не удалось получить обновления: %s', error)
+                await asyncio.sleep(UPDATES_RETRY_DELAY)
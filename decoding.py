@@ -0,0 +1,68 @@
+import json
+import os
+
+from exceptions import ConnectionError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+JSON_LEAN = os.getenv('JSON_LEAN', '0') == '1'
+
+HOMEWORK_FIELDS = ('id', 'homework_name', 'status', 'date_updated')
+LEAN_KEYS = frozenset(('homeworks', 'current_date') + HOMEWORK_FIELDS)
+
+
+def backend() -> str:
+    """Возвращает имя используемого JSON-декодера."""
+    if JSON_BACKEND == 'json' or orjson is None:
+        return 'json'
+    return 'orjson'
+
+
+def _lean_object(pairs: list) -> dict:
+    return {key: value for key, value in pairs if key in LEAN_KEYS}
+
+
+def _project(data):
+    """Оставляет в ответе только поля, нужные для разбора статусов."""
+    if not isinstance(data, dict):
+        return data
+    homeworks = data.get('homeworks')
+    if isinstance(homeworks, list):
+        homeworks = [
+            {key: work[key] for key in HOMEWORK_FIELDS if key in work}
+            if isinstance(work, dict) else work
+            for work in homeworks
+        ]
+    lean: dict = {'homeworks': homeworks} if 'homeworks' in data else {}
+    if 'current_date' in data:
+        lean['current_date'] = data['current_date']
+    return lean
+
+
+def loads(body: bytes, lean: bool = JSON_LEAN):
+    """Разбирает JSON быстрейшим доступным декодером.
+
+    В экономном режиме в словарях работ остаются только поля
+    HOMEWORK_FIELDS: стандартный декодер не создаёт словари с лишними
+    полями, а для orjson ответ сокращается сразу после разбора. Режим
+    экономит память ценой CPU: разбор в нём медленнее полного.
+    """
+    if backend() == 'orjson':
+        data = orjson.loads(body)
+        return _project(data) if lean else data
+    if lean:
+        return json.loads(body, object_pairs_hook=_lean_object)
+    return json.loads(body)
+
+
+def decode_api_body(body: bytes, lean: bool = JSON_LEAN):
+    """Разбирает тело ответа API."""
+    try:
+        return loads(body, lean)
+    except Exception as error:
+        raise ConnectionError(f'Ошибка при запросе к API: {error}') from error
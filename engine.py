@@ -0,0 +1,864 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+import commands
+import fingerprint
+import health
+import homework
+import ingest
+import metrics
+import scheduler
+from errorcache import ERROR_DIGEST_INTERVAL, ErrorCache
+from exceptions import MissingKeysInDictionary
+from fingerprint import ResponseCache
+from homework import StatusMessage, check_response
+from journal import (JOURNAL_COMPACT_SIZE, JOURNAL_FLUSH_INTERVAL,
+                     NOTIFY_JOURNAL, NotificationJournal)
+from outbox import OutboundQueue
+from recording import RECORD_FILE, start_recording
+from ratelimit import TokenBucket
+from scheduler import PollScheduler, SeededRandom
+from storage import CHECKPOINT_INTERVAL, STATE_DB, StateStore
+from tracker import HomeworkTracker, homework_key, intern_status
+from watermark import initial_from_date, next_from_date
+
+
+logger = logging.getLogger(__name__)
+
+ENGINE_MAX_WORKERS = int(os.getenv('ENGINE_MAX_WORKERS', 32))
+HISTORY_SIZE = int(os.getenv('HISTORY_SIZE', 20))
+# Общий лимит запросов к API на процесс; 0 отключает ограничение.
+API_RATE = float(os.getenv('API_RATE', 10))
+API_BURST = float(os.getenv('API_BURST', 20))
+SUBSCRIPTION_KEYS = ('practicum_token', 'chat_id')
+# Heroku ждёт после SIGTERM 30 секунд, а затем убивает процесс.
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 20))
+
+# Настройки, которые по SIGHUP перечитываются из .env без перезапуска.
+RELOADABLE_SETTINGS = (
+    (homework, 'PRACTICUM_TOKEN', str),
+    (homework, 'TELEGRAM_CHAT_ID', str),
+    (homework, 'SUBSCRIPTIONS_FILE', str),
+    (homework, 'RETRY_TIME', int),
+    (scheduler, 'POLL_MIN_INTERVAL', float),
+    (scheduler, 'POLL_MAX_INTERVAL', float),
+    (scheduler, 'BACKOFF_BASE', float),
+    (scheduler, 'POLL_JITTER', float),
+)
+
+OUTBOX_GAUGE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_outbox', 'Состояние очереди отправки.', ('value',)
+))
+OUTBOX_LATENCY_GAUGE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_outbox_latency_seconds', 'Задержка доставки сообщений.',
+    ('quantile',), aggregate='max'
+))
+CACHE_GAUGE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_response_cache', 'Попадания в кэш ответов API.',
+    ('result',)
+))
+SUBSCRIPTIONS_GAUGE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_subscriptions', 'Количество подписок.'
+))
+REQUESTS_GAUGE = metrics.REGISTRY.register(metrics.Gauge(
+    'homework_bot_api_requests',
+    'Запросы к API: выполненные и схлопнутые с одновременными.',
+    ('result',)
+))
+QUOTA_DELAY = metrics.REGISTRY.register(metrics.Histogram(
+    'homework_bot_api_quota_delay_seconds',
+    'Задержка запросов к API из-за общего лимита.',
+    buckets=(0, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+))
+SUPPRESSED_ERRORS = metrics.REGISTRY.register(metrics.Counter(
+    'homework_bot_errors_suppressed_total',
+    'Повторы ошибок, не отправленные в чат.'
+))
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Subscription:
+    """Подписка чата Telegram на статусы работ одного токена Практикума."""
+
+    __slots__ = ('practicum_token', 'chat_id', 'token_key', 'key')
+
+    def __init__(self, practicum_token: str, chat_id) -> None:
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+        # Отпечаток токена Практикума, общий для его подписок, и ключ
+        # подписки, не раскрывающий токен.
+        self.token_key = fingerprint.token_fingerprint(practicum_token)
+        self.key = f'{self.token_key}:{chat_id}'
+
+
+class SubscriptionState:
+    """Состояние опроса одной подписки.
+
+    seed задаёт случайный разброс пауз планировщика: у подписок одного
+    токена он одинаковый, поэтому они опрашивают API одновременно и их
+    запросы схлопываются.
+
+    На одну подписку приходится мало данных, а подписок может быть
+    больше ста тысяч, поэтому состояние хранится в __slots__, а кэш
+    ошибок и история смен статусов создаются только когда появляется что
+    хранить.
+    """
+
+    __slots__ = (
+        'from_date', 'tracker', 'scheduler', 'cache', '_errors',
+        'polled_at', 'failed_at', 'quota_delay', 'history', 'wakeup',
+        'waiters'
+    )
+
+    def __init__(self, from_date: int = None,
+                 statuses: dict = None, seed: str = None,
+                 names: dict = None) -> None:
+        if from_date is None:
+            from_date = initial_from_date(time.time())
+        self.from_date = from_date
+        self.tracker = HomeworkTracker(statuses, names)
+        self.scheduler = PollScheduler(
+            homework.RETRY_TIME,
+            rand=SeededRandom(seed) if seed else random.random
+        )
+        self.cache = ResponseCache()
+        self._errors = None
+        self.polled_at = None
+        self.failed_at = None
+        self.quota_delay = 0.0
+        # Последние HISTORY_SIZE смен статусов для /history: кортежи
+        # (время, ключ работы, название, статус).
+        self.history = None
+        # Внеочередной опрос: wakeup будит задачу опроса, а waiters
+        # получают результат, когда опрос закончится.
+        self.wakeup = None
+        self.waiters = None
+
+    @property
+    def errors(self) -> ErrorCache:
+        """Кэш ошибок подписки, создаётся при первой ошибке."""
+        if self._errors is None:
+            self._errors = ErrorCache()
+        return self._errors
+
+    def error_digest(self):
+        """Сводка подавленных ошибок или None."""
+        return self._errors.digest() if self._errors is not None else None
+
+    def remember(self, homework: dict) -> None:
+        """Запоминает смену статуса работы для /status и /history."""
+        key = homework_key(homework)
+        if self.history is None:
+            self.history = []
+        self.history.append((
+            time.time(), key, homework.get('homework_name', key),
+            intern_status(homework.get('status'))
+        ))
+        if len(self.history) > HISTORY_SIZE:
+            del self.history[0]
+
+
+def reload_settings() -> list:
+    """Перечитывает .env и возвращает имена изменившихся настроек."""
+    load_dotenv(override=True)
+    changed: list = []
+    for module, name, cast in RELOADABLE_SETTINGS:
+        value = os.getenv(name)
+        if value is None or cast(value) == getattr(module, name):
+            continue
+        setattr(module, name, cast(value))
+        changed.append(name)
+    return changed
+
+
+def load_subscriptions(path: str = None) -> list:
+    """Загружает подписки из JSON-файла или из переменных окружения."""
+    path = path or homework.SUBSCRIPTIONS_FILE
+    if not path:
+        return [
+            Subscription(homework.PRACTICUM_TOKEN, homework.TELEGRAM_CHAT_ID)
+        ]
+    with open(path, encoding='UTF-8') as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise TypeError(f'Файл подписок содержит не список, а {type(data)}')
+    subscriptions: list = []
+    for item in data:
+        if not all(key in item for key in SUBSCRIPTION_KEYS):
+            raise MissingKeysInDictionary(
+                f'Отсутствуют ключи {SUBSCRIPTION_KEYS} в подписке'
+            )
+        subscriptions.append(
+            Subscription(item['practicum_token'], item['chat_id'])
+        )
+    return subscriptions
+
+
+class PollingEngine:
+    """Опрашивает API Практикума параллельно для всех подписок.
+
+    Если задан журнал, уведомления о смене статуса сначала записываются
+    в него и уходят в очередь отправки только после fsync пачки записей.
+    Статусы попадают в хранилище не раньше, чем их уведомления в журнал.
+
+    Запросы к API всех подписок проходят через общий token bucket с
+    частотой api_rate и запасом api_burst, поэтому после запуска или сбоя
+    опросы не уходят разом. Дальше их разносит по интервалу опроса
+    PollScheduler: фаза первой паузы и разброс остальных задаются
+    генератором, засеянным токеном подписки.
+
+    По SIGTERM движок перестаёт опрашивать API, отправляет очередь не
+    дольше SHUTDOWN_TIMEOUT и сохраняет состояние. По SIGHUP перечитывает
+    настройки, а если задан subscription_source — и список подписок.
+
+    recorder, если задан, получает подписки при запуске и после
+    перечитывания и закрывается вместе с движком. breaker и flights
+    заменяют общие для процесса предохранитель и схлопывание запросов.
+    """
+
+    def __init__(self, bot, subscriptions: list, store=None,
+                 max_workers: int = ENGINE_MAX_WORKERS,
+                 serve_http: bool = True, journal=None,
+                 subscription_source=None, api_rate: float = API_RATE,
+                 api_burst: float = API_BURST, recorder=None,
+                 breaker=None, flights=None) -> None:
+        self.bot = bot
+        self.recorder = recorder
+        self.breaker = breaker
+        self.flights = flights or fingerprint.FLIGHTS
+        self.subscriptions = list(subscriptions)
+        self._index_chats()
+        self.subscription_source = subscription_source
+        self.store = store
+        self.journal = journal
+        self.serve_http = serve_http
+        self.states: dict = {}
+        self._dirty: set = set()
+        self._unflushed: list = []
+        self._inflight: dict = {}
+        self._pollers: dict = {}
+        self._stopping = None
+        self._reloading = None
+        self.api_bucket = (
+            TokenBucket(api_rate, max(api_burst, 1)) if api_rate > 0 else None
+        )
+        self._quota_waits: dict = {}
+        self.beat = time.monotonic()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='engine'
+        )
+        # Записи в журнал идут по одной и в порядке постановки.
+        self._journal_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='journal'
+        )
+        self.outbox = OutboundQueue(
+            bot, self._executor, on_done=self._acknowledge
+        )
+        self.watchdog = (
+            health.Watchdog(self.stall_reason)
+            if health.WATCHDOG_ACTION != 'off' else None
+        )
+
+    async def _call(self, func, *args):
+        """Выполняет блокирующий вызов в пуле потоков."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def new_state(self, subscription: Subscription, from_date: int = None,
+                  statuses: dict = None,
+                  names: dict = None) -> SubscriptionState:
+        """Создаёт и запоминает состояние опроса подписки."""
+        state = self.states[subscription.key] = SubscriptionState(
+            from_date, statuses, seed=subscription.token_key, names=names
+        )
+        return state
+
+    async def _journal_call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._journal_executor, func, *args)
+
+    async def wait_quota(self, subscription: Subscription,
+                         state: SubscriptionState) -> float:
+        """Ждёт очереди в общем лимите запросов и возвращает задержку.
+
+        Подписки одного токена с одинаковым from_date ждут вместе и
+        тратят один токен: их запросы всё равно схлопываются в один.
+        """
+        if self.api_bucket is None:
+            return 0.0
+        key = (subscription.token_key, state.from_date)
+        wait = self._quota_waits.get(key)
+        if wait is None:
+            wait = self._quota_waits[key] = asyncio.ensure_future(
+                self.api_bucket.acquire()
+            )
+            wait.add_done_callback(
+                lambda _: self._quota_waits.pop(key, None)
+            )
+        delay = await asyncio.shield(wait)
+        state.quota_delay = delay
+        QUOTA_DELAY.observe(delay)
+        if delay:
+            logger.debug(
+                'Запрос подписки %s отложен лимитом на %.3f с',
+                subscription.key, delay
+            )
+        return delay
+
+    def _fetch(self, key: str, cache: ResponseCache, token: str,
+               from_date: int):
+        """Запрос к API в потоке пула.
+
+        Начало запроса отмечается уже в потоке, поэтому ожидание свободного
+        потока при медленном API сторож не считает зависшим запросом.
+        """
+        self._inflight[key] = time.monotonic()
+        try:
+            return cache.fetch(token, from_date, self.breaker, self.flights)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def poll_once(self, subscription: Subscription,
+                        state: SubscriptionState) -> float:
+        """Выполняет один цикл опроса и возвращает паузу до следующего."""
+        try:
+            await self.wait_quota(subscription, state)
+            with metrics.timer('get_api_answer'):
+                response = await self._call(
+                    self._fetch, subscription.key, state.cache,
+                    subscription.practicum_token, state.from_date
+                )
+            state.polled_at = time.time()
+            if response is None:
+                if state.cache.current_date is not None:
+                    state.from_date = next_from_date(
+                        state.from_date, state.cache.current_date, []
+                    )
+                return state.scheduler.on_success(False)
+            with metrics.timer('check_response'):
+                homeworks = check_response(response)
+            state.from_date = next_from_date(
+                state.from_date, response.get('current_date'), homeworks
+            )
+            state.cache.commit()
+        except Exception as error:
+            state.failed_at = time.time()
+            await self._report_error(subscription, state, error)
+            return state.scheduler.on_error(error)
+        finally:
+            self._dirty.add(subscription.key)
+        changes = await self.process_homeworks(subscription, state, homeworks)
+        return state.scheduler.on_success(bool(changes))
+
+    async def process_homeworks(self, subscription: Subscription,
+                                state: SubscriptionState,
+                                homeworks: list) -> list:
+        """Отправляет уведомления о сменах статуса и возвращает их список."""
+        changes: list = []
+        for changed in state.tracker.changes(homeworks):
+            try:
+                with metrics.timer('parse_status'):
+                    # Текст уведомления соберётся только при отправке.
+                    message = StatusMessage(changed)
+            except Exception as error:
+                # Неверная запись не затирает последний известный статус.
+                await self._report_error(subscription, state, error)
+                continue
+            state.tracker.update(changed)
+            state.remember(changed)
+            self.notify(subscription, changed, message)
+            changes.append(changed)
+        if changes:
+            self._dirty.add(subscription.key)
+        return changes
+
+    def notify(self, subscription: Subscription, homework: dict,
+               message: StatusMessage) -> None:
+        """Отправляет уведомление о смене статуса через журнал."""
+        if self.journal is None:
+            self.outbox.put(subscription.chat_id, message)
+            return
+        entry = self.journal.record(
+            (subscription.key, homework_key(homework), homework['status']),
+            subscription.chat_id, message
+        )
+        if entry is not None:
+            self._unflushed.append(entry)
+
+    def _acknowledge(self, message) -> None:
+        if message.key is not None:
+            self.journal.ack(message.key)
+
+    async def flush_journal(self) -> None:
+        """Записывает журнал и отдаёт записанные уведомления в отправку."""
+        released, self._unflushed = self._unflushed, []
+        data = self.journal.take()
+        try:
+            await self._journal_call(self.journal.write, data)
+        except Exception:
+            self.journal.put_back(data)
+            self._unflushed[:0] = released
+            raise
+        for entry in released:
+            self.outbox.put(entry.chat_id, entry.text, entry.seq)
+
+    async def journal_forever(self) -> None:
+        """Групповая запись журнала: один fsync на все записи интервала."""
+        while True:
+            await asyncio.sleep(JOURNAL_FLUSH_INTERVAL)
+            try:
+                await self.flush_journal()
+            except Exception as error:
+                logger.error('Не удалось записать журнал: %s', error)
+
+    async def compact_journal(self, upto: int) -> None:
+        """Переписывает журнал без записей, статусы которых сохранены."""
+        await self._journal_call(
+            self.journal.rewrite, self.journal.snapshot(upto)
+        )
+
+    async def replay_journal(self) -> None:
+        """Восстанавливает статусы из журнала и повторяет недоставленное."""
+        entries = await self._journal_call(self.journal.load)
+        orphans: list = []
+        for entry in entries:
+            key, homework_id, status = entry.key
+            state = self.states.get(key)
+            if state is None:
+                orphans.append(entry.key)
+            elif state.tracker.statuses.get(homework_id) != status:
+                state.tracker.set_status(homework_id, status)
+                self._dirty.add(key)
+        if orphans and self.store:
+            # Подписки, которые теперь обслуживает другой процесс.
+            await self._call(self.store.add_statuses, orphans)
+        for entry in self.journal.pending.values():
+            self.outbox.put(entry.chat_id, entry.text, entry.seq)
+        logger.info(
+            'Из журнала повторно отправляется %s уведомлений',
+            len(self.journal.pending)
+        )
+        upto = self.journal.sequence
+        await self.checkpoint()
+        await self.compact_journal(upto)
+
+    def _index_chats(self) -> None:
+        # Кортежи вместо списков: у большинства чатов одна подписка.
+        self._chats: dict = {}
+        for subscription in self.subscriptions:
+            chat_id = str(subscription.chat_id)
+            self._chats[chat_id] = self._chats.get(chat_id, ()) + (
+                subscription,
+            )
+
+    def find_subscriptions(self, key: str = None, chat_id=None) -> list:
+        """Ищет подписки по ключу или по id чата."""
+        if key is not None:
+            return [
+                subscription for subscription in self.subscriptions
+                if subscription.key == key
+            ]
+        return list(self._chats.get(str(chat_id), ()))
+
+    async def ingest(self, subscription: Subscription,
+                     homeworks: list) -> None:
+        """Обрабатывает работы, присланные во входящем событии.
+
+        События могут прийти позже опроса, поэтому работа, обновлённая
+        раньше уже учтённого статуса, пропускается.
+        """
+        state = self.states.get(subscription.key) or self.new_state(
+            subscription
+        )
+        homeworks = [
+            homework for homework in homeworks
+            if not state.tracker.is_stale(homework)
+        ]
+        await self.process_homeworks(subscription, state, homeworks)
+
+    async def _report_error(self, subscription: Subscription,
+                            state: SubscriptionState,
+                            error: Exception) -> None:
+        """Логирует ошибку и сообщает о ней в чат, если она не повтор."""
+        logger.error(
+            'Ошибка опроса подписки %s: %s', subscription.key, error
+        )
+        if state.errors.report(error):
+            self.outbox.put(subscription.chat_id, str(error))
+        else:
+            SUPPRESSED_ERRORS.inc()
+
+    def send_digests(self) -> None:
+        """Отправляет сводки ошибок, подавленных с прошлой сводки."""
+        for subscription in self.subscriptions:
+            state = self.states.get(subscription.key)
+            digest = state.error_digest() if state else None
+            if digest:
+                self.outbox.put(subscription.chat_id, digest)
+
+    async def digest_forever(self) -> None:
+        """Периодически отправляет сводки подавленных ошибок."""
+        while True:
+            await asyncio.sleep(ERROR_DIGEST_INTERVAL)
+            self.send_digests()
+
+    async def poll_subscription(self, subscription: Subscription) -> None:
+        """Бесконечно опрашивает API для одной подписки."""
+        state = self.states.get(subscription.key) or self.new_state(
+            subscription
+        )
+        loop = asyncio.get_running_loop()
+        state.wakeup = loop.create_future()
+        while True:
+            delay = await self.poll_once(subscription, state)
+            waiters, state.waiters = state.waiters, None
+            for waiter in waiters or ():
+                _wake(waiter)
+            # Пауза ждёт future, который refresh() может завершить раньше.
+            state.wakeup = loop.create_future()
+            timer = loop.call_later(delay, _wake, state.wakeup)
+            try:
+                await state.wakeup
+            finally:
+                timer.cancel()
+
+    async def refresh(self, subscription: Subscription, max_age: float,
+                      timeout: float) -> None:
+        """Опрашивает подписку вне очереди, если её данные старше max_age.
+
+        Неудачный опрос тоже считается свежим, поэтому частые команды
+        не обходят паузу после ошибок API.
+        """
+        state = self.states.get(subscription.key)
+        if state is None or state.wakeup is None:
+            return
+        checked = max(state.polled_at or 0, state.failed_at or 0)
+        if time.time() - checked <= max_age:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        if state.waiters is None:
+            state.waiters = []
+        state.waiters.append(waiter)
+        _wake(state.wakeup)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                'Опрос подписки %s не закончился за %s с',
+                subscription.key, timeout
+            )
+
+    def start_polling(self, subscription: Subscription) -> None:
+        """Запускает задачу опроса подписки."""
+        self._pollers[subscription.key] = asyncio.ensure_future(
+            self.poll_subscription(subscription)
+        )
+
+    async def stop_polling(self, keys=None) -> None:
+        """Останавливает опрос подписок с ключами keys или всех."""
+        if keys is None:
+            keys = list(self._pollers)
+        tasks = [self._pollers.pop(key) for key in keys]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def update_subscriptions(self, subscriptions: list) -> None:
+        """Запускает опрос новых подписок и останавливает удалённые."""
+        wanted = {
+            subscription.key: subscription for subscription in subscriptions
+        }
+        removed = [key for key in self._pollers if key not in wanted]
+        added = [
+            subscription for key, subscription in wanted.items()
+            if key not in self._pollers
+        ]
+        await self.stop_polling(removed)
+        if removed:
+            try:
+                await self.checkpoint()
+            except Exception as error:
+                logger.error('Не удалось сохранить состояние: %s', error)
+        for key in removed:
+            self.states.pop(key, None)
+            self._dirty.discard(key)
+        self.subscriptions = list(wanted.values())
+        self._index_chats()
+        saved: dict = {}
+        if self.store and added:
+            saved = await self._call(self.store.load)
+        for subscription in added:
+            self.new_state(
+                subscription, *saved.get(subscription.key, (None, None, None))
+            )
+            self.start_polling(subscription)
+        if self.recorder and added:
+            self.recorder.subscriptions(added, self.states)
+        logger.info(
+            'Подписки обновлены: добавлено %s, удалено %s',
+            len(added), len(removed)
+        )
+
+    async def reload(self) -> None:
+        """Перечитывает настройки и подписки по SIGHUP."""
+        subscriptions = None
+        try:
+            changed = reload_settings()
+            if self.subscription_source:
+                subscriptions = await self._call(self.subscription_source)
+        except Exception as error:
+            logger.error('Не удалось перечитать настройки: %s', error)
+            return
+        for state in self.states.values():
+            state.scheduler.configure(homework.RETRY_TIME)
+        logger.info(
+            'Настройки перечитаны, изменились: %s', ', '.join(changed) or '-'
+        )
+        if subscriptions is not None:
+            await self.update_subscriptions(subscriptions)
+
+    def request_reload(self) -> None:
+        """Обработчик SIGHUP."""
+        self._reloading = asyncio.ensure_future(self.reload())
+
+    def stop(self) -> None:
+        """Обработчик SIGTERM: просит движок завершить работу."""
+        logger.info('Получен сигнал остановки')
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def drain(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """Отправляет очередь сообщений, но не дольше timeout секунд.
+
+        Не отправленные уведомления остаются в журнале и уходят после
+        перезапуска.
+        """
+        try:
+            await asyncio.wait_for(self._flush_outbox(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                'За %s с не отправлено %s сообщений', timeout,
+                self.outbox.depth + self.outbox.delayed
+            )
+        except Exception as error:
+            logger.error('Не удалось отправить очередь: %s', error)
+
+    async def _flush_outbox(self) -> None:
+        if self.journal:
+            await self.flush_journal()
+        await self.outbox.join()
+
+    def handle_signals(self) -> None:
+        """Устанавливает обработчики SIGTERM и SIGHUP в цикле событий."""
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, self.stop)
+        loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+
+    async def restore(self) -> None:
+        """Загружает сохранённое состояние подписок из хранилища."""
+        saved = await self._call(self.store.load) if self.store else {}
+        for subscription in self.subscriptions:
+            self.new_state(
+                subscription, *saved.get(subscription.key, (None, None, None))
+            )
+        logger.info('Восстановлено состояние %s подписок', len(saved))
+        if self.journal:
+            await self.replay_journal()
+
+    async def checkpoint(self) -> None:
+        """Сохраняет состояние подписок, изменившееся с прошлого раза."""
+        dirty, self._dirty = self._dirty, set()
+        if not self.store or not dirty:
+            return
+        upto = self.journal.sequence if self.journal else 0
+        subscriptions: list = []
+        statuses: list = []
+        popped: dict = {}
+        for key in dirty:
+            state = self.states[key]
+            subscriptions.append((key, state.from_date))
+            popped[key] = state.tracker.pop_dirty()
+            statuses.extend(
+                (key, homework_id, status, state.tracker.name(homework_id))
+                for homework_id, status in popped[key].items()
+            )
+        try:
+            if self.journal:
+                await self.flush_journal()
+            await self._call(self.store.save, subscriptions, statuses)
+        except Exception:
+            self._dirty |= dirty
+            for key, changed in popped.items():
+                self.states[key].tracker.mark_dirty(changed)
+            raise
+        if self.journal and len(self.journal.acked) >= JOURNAL_COMPACT_SIZE:
+            await self.compact_journal(upto)
+
+    async def checkpoint_forever(self) -> None:
+        """Периодически сохраняет состояние подписок."""
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            try:
+                await self.checkpoint()
+            except Exception as error:
+                logger.error('Не удалось сохранить состояние: %s', error)
+
+    async def heartbeat(self) -> None:
+        """Отмечает, что цикл событий не завис."""
+        while True:
+            self.beat = time.monotonic()
+            await asyncio.sleep(1)
+
+    def stall_reason(self):
+        """Описание зависания для сторожа или None.
+
+        Вызывается из потока сторожа.
+        """
+        now = time.monotonic()
+        if now - self.beat > health.WATCHDOG_LOOP_TIMEOUT:
+            return f'цикл событий не отвечает {now - self.beat:.0f} с'
+        started = min(list(self._inflight.values()), default=now)
+        if now - started > health.WATCHDOG_POLL_TIMEOUT:
+            return f'запрос к API выполняется {now - started:.0f} с'
+        return None
+
+    def health_report(self) -> dict:
+        """Время последних опросов и отправок для /health."""
+        return {
+            'time': time.time(),
+            'subscriptions': {
+                key: {
+                    'last_poll': state.polled_at,
+                    'last_error': state.failed_at,
+                    'quota_delay': state.quota_delay,
+                }
+                for key, state in list(self.states.items())
+            },
+            'chats': {
+                str(chat_id): sent_at
+                for chat_id, sent_at in list(self.outbox.last_sent.items())
+            },
+            'outbox': self.outbox.stats(),
+        }
+
+    def collect_metrics(self) -> None:
+        """Обновляет метрики очереди отправки, кэша и подписок."""
+        for name, value in self.outbox.stats().items():
+            if name.startswith('latency_'):
+                OUTBOX_LATENCY_GAUGE.set(value, name[len('latency_'):])
+            else:
+                OUTBOX_GAUGE.set(value, name)
+        for name, value in fingerprint.STATS.items():
+            CACHE_GAUGE.set(value, name)
+        flights = self.flights.stats()
+        for name in ('executed', 'coalesced'):
+            REQUESTS_GAUGE.set(flights[name], name)
+        SUBSCRIPTIONS_GAUGE.set(len(self.subscriptions))
+
+    def background_tasks(self) -> list:
+        """Служебные задачи, работающие вместе с опросом."""
+        tasks = [
+            self.outbox.run(), self.checkpoint_forever(),
+            self.digest_forever(), self.heartbeat()
+        ]
+        if self.journal:
+            tasks.append(self.journal_forever())
+        if metrics.ENABLED:
+            metrics.REGISTRY.add_collector(self.collect_metrics)
+            tasks.append(metrics.measure_loop_lag())
+        if not self.serve_http:
+            return tasks
+        if metrics.ENABLED:
+            metrics.start_server()
+        if health.ENABLED:
+            health.start_server(self.health_report, self.watchdog)
+        if commands.ENABLED:
+            tasks.append(commands.CommandListener(self).run())
+        if ingest.ENABLED:
+            ingest.start_server(
+                self.find_subscriptions,
+                ingest.engine_dispatcher(self, asyncio.get_running_loop())
+            )
+        return tasks
+
+    async def run(self) -> None:
+        """Запускает опрос всех подписок."""
+        logger.info('Запускаем опрос %s подписок', len(self.subscriptions))
+        await self.restore()
+        if self.recorder:
+            self.recorder.subscriptions(self.subscriptions, self.states)
+        self._stopping = asyncio.Event()
+        self.handle_signals()
+        if self.watchdog:
+            self.watchdog.start()
+        service = asyncio.ensure_future(
+            asyncio.gather(*self.background_tasks())
+        )
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        for subscription in self.subscriptions:
+            self.start_polling(subscription)
+        try:
+            await asyncio.wait(
+                (service, stopping), return_when=asyncio.FIRST_COMPLETED
+            )
+            if service.done():
+                service.result()
+            # Очередь отправляется после остановки опроса, чтобы за время
+            # ожидания в неё не попадали новые сообщения.
+            await self.stop_polling()
+            await self.drain()
+        finally:
+            stopping.cancel()
+            for task in self._pollers.values():
+                task.cancel()
+            service.cancel()
+            await asyncio.gather(service, return_exceptions=True)
+            await self.checkpoint()
+            if self.journal:
+                await self._journal_call(self.journal.close)
+            if self.recorder:
+                self.recorder.close()
+            if self.watchdog:
+                self.watchdog.stop()
+            self._executor.shutdown(wait=False)
+            self._journal_executor.shutdown()
+
+
+def build_engine(subscriptions: list, serve_http: bool = True,
+                 journal_path: str = NOTIFY_JOURNAL,
+                 subscription_source=None,
+                 api_rate: float = API_RATE,
+                 record_path: str = RECORD_FILE) -> PollingEngine:
+    """Создаёт движок с общей HTTP-сессией, ботом и хранилищем состояния.
+
+    Бот создаётся лениво, чтобы первый опрос не ждал загрузки
+    python-telegram-bot. Если задан record_path, ответы API и отправленные
+    сообщения записываются в него для последующего проигрывания.
+    """
+    homework.init_http_session()
+    store = StateStore(STATE_DB) if STATE_DB else None
+    # Без хранилища статусы не переживают перезапуск, и журнал не нужен.
+    journal = (
+        NotificationJournal(journal_path) if store and journal_path else None
+    )
+    bot = homework.LazyBot()
+    recorder = None
+    if record_path:
+        bot, recorder = start_recording(record_path, bot)
+    return PollingEngine(
+        bot, subscriptions, store, serve_http=serve_http,
+        journal=journal, subscription_source=subscription_source,
+        api_rate=api_rate, recorder=recorder
+    )
@@ -0,0 +1,86 @@
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+ERROR_CACHE_SIZE = int(os.getenv('ERROR_CACHE_SIZE', 64))
+ERROR_TTL = float(os.getenv('ERROR_TTL', 3600))
+ERROR_DIGEST_INTERVAL = float(os.getenv('ERROR_DIGEST_INTERVAL', 3600))
+DIGEST_MAX_LINES = 10
+
+# Адреса объектов и длинные числа (таймстемпы, id, порты) меняются от
+# раза к разу, хотя ошибка та же.
+VOLATILE_RE = re.compile(r'0x[0-9a-fA-F]+|\d{4,}')
+
+
+def error_key(error: BaseException) -> tuple:
+    """Ключ ошибки: класс и сообщение без изменчивых частей."""
+    return type(error).__name__, VOLATILE_RE.sub('…', str(error))
+
+
+class ErrorEntry:
+    """Сведения об одной ошибке в кэше."""
+
+    __slots__ = ('message', 'reported', 'suppressed')
+
+    def __init__(self, message: str, reported: float) -> None:
+        self.message = message
+        self.reported = reported
+        self.suppressed = 0
+
+
+class ErrorCache:
+    """Решает, сообщать ли об ошибке в чат, и копит подавленные повторы.
+
+    Об ошибке сообщается при первом появлении и снова, когда с прошлого
+    сообщения прошло ttl секунд. Повторы в этом окне только считаются и
+    попадают в периодическую сводку digest(). Хранится не больше size
+    ошибок, давно не встречавшиеся вытесняются первыми.
+    """
+
+    def __init__(self, size: int = ERROR_CACHE_SIZE, ttl: float = ERROR_TTL,
+                 clock=time.monotonic) -> None:
+        self.size = size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def report(self, error: BaseException) -> bool:
+        """Учитывает ошибку и возвращает True, если о ней нужно сообщить."""
+        key = error_key(error)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if now - entry.reported < self.ttl:
+                entry.suppressed += 1
+                return False
+            entry.reported = now
+            return True
+        self._entries[key] = ErrorEntry(str(error), now)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return True
+
+    def digest(self) -> Optional[str]:
+        """Возвращает сводку подавленных ошибок и обнуляет их счётчики."""
+        lines: list = []
+        total = 0
+        for (name, _), entry in reversed(self._entries.items()):
+            if not entry.suppressed:
+                continue
+            total += entry.suppressed
+            if len(lines) < DIGEST_MAX_LINES:
+                lines.append(
+                    f'{name}: {entry.message} — {entry.suppressed} раз'
+                )
+            entry.suppressed = 0
+        if not total:
+            return None
+        header = f'Повторяющиеся ошибки, не отправленные в чат: {total}'
+        return '\n'.join([header, *lines])
@@ -1,6 +1,11 @@
 class WrongAPIResponseCodeError(Exception):
     """Исключение не правильного ответа API."""
-    pass
+
+    def __init__(self, message: str = '', status_code: int = None,
+                 retry_after: float = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
 class ConnectionError(Exception):
@@ -11,3 +16,11 @@ class ConnectionError(Exception):
 class MissingKeysInDictionary(Exception):
     """Исключение нехватки ключа."""
     pass
+
+
+class CircuitOpenError(ConnectionError):
+    """Исключение: API недоступно, запрос не отправлялся."""
+
+    def __init__(self, message: str = '', retry_after: float = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
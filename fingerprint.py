@@ -0,0 +1,101 @@
+import hashlib
+import re
+from http import HTTPStatus
+from typing import Optional
+
+import homework
+from breaker import get_breaker
+from decoding import decode_api_body
+from singleflight import SingleFlight
+
+
+CURRENT_DATE_RE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+
+STATS: dict = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+# Общие для процесса запросы к API: подписки с одним токеном, опрашивающие
+# его одновременно с тем же from_date, делают один HTTP-запрос.
+FLIGHTS = SingleFlight()
+
+
+def token_fingerprint(token: str) -> str:
+    """Отпечаток токена Практикума, не раскрывающий сам токен."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def hit_rate() -> float:
+    """Доля опросов, обработанных без разбора ответа."""
+    hits = STATS['hits'] + STATS['not_modified']
+    total = hits + STATS['misses']
+    return hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Кэш последнего ответа API одной подписки.
+
+    Отпечаток считается по телу ответа без `current_date`, поэтому
+    повторный ответ с теми же работами отбрасывается до разбора JSON
+    и проверок. Если API отдаёт ETag или Last-Modified, следующий запрос
+    делается условным.
+    """
+
+    __slots__ = (
+        'digest', 'etag', 'last_modified', 'current_date', '_pending'
+    )
+
+    def __init__(self) -> None:
+        self.digest: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.current_date: Optional[int] = None
+        self._pending: Optional[bytes] = None
+
+    def request_headers(self) -> dict:
+        """Заголовки условного запроса."""
+        headers: dict = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def fetch(self, token: str, from_date: int, breaker=None,
+              flights: SingleFlight = None) -> Optional[dict]:
+        """Запрашивает API и возвращает ответ или None, если он не изменился.
+
+        При неизменном ответе в current_date остаётся дата из тела ответа,
+        если её удалось найти без разбора JSON. Запрос идёт через breaker,
+        по умолчанию общий для всех подписок предохранитель адреса API,
+        а одновременные одинаковые запросы схлопываются в один через
+        flights, по умолчанию FLIGHTS.
+        """
+        if breaker is None:
+            breaker = get_breaker(homework.ENDPOINT)
+        headers = self.request_headers()
+        response = (flights or FLIGHTS).do(
+            (token, from_date, tuple(sorted(headers.items()))),
+            breaker.call,
+            homework.fetch_api_response, token, from_date, headers
+        )
+        self.current_date = None
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            STATS['not_modified'] += 1
+            return None
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        body: bytes = response.content
+        match = CURRENT_DATE_RE.search(body)
+        digest = hashlib.blake2b(
+            CURRENT_DATE_RE.sub(b'', body), digest_size=16
+        ).digest()
+        if digest == self.digest:
+            STATS['hits'] += 1
+            self.current_date = int(match.group(1)) if match else None
+            return None
+        STATS['misses'] += 1
+        self._pending = digest
+        return decode_api_body(body)
+
+    def commit(self) -> None:
+        """Запоминает отпечаток ответа после его успешной обработки."""
+        self.digest = self._pending
@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import sys
+import threading
+import traceback
+from http import HTTPStatus
+
+from webserver import get_endpoint
+
+
+logger = logging.getLogger(__name__)
+
+HEALTH_HOST = os.getenv('HEALTH_HOST', '127.0.0.1')
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+ENABLED = bool(HEALTH_PORT)
+
+WATCHDOG_INTERVAL = float(os.getenv('WATCHDOG_INTERVAL', 10))
+# С запасом больше REQUEST_TIMEOUT: запрос дольше этого завис.
+WATCHDOG_POLL_TIMEOUT = float(os.getenv('WATCHDOG_POLL_TIMEOUT', 300))
+WATCHDOG_LOOP_TIMEOUT = float(os.getenv('WATCHDOG_LOOP_TIMEOUT', 60))
+# exit — записать стеки и завершить процесс, dump — только записать,
+# off — не запускать сторожа.
+WATCHDOG_ACTION = os.getenv('WATCHDOG_ACTION', 'exit')
+WATCHDOG_EXIT_CODE = 70
+
+
+def dump_threads() -> str:
+    """Стеки всех потоков процесса."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    parts: list = []
+    for ident, frame in sys._current_frames().items():
+        parts.append(f'Поток {names.get(ident, ident)}:\n')
+        parts.extend(traceback.format_stack(frame))
+    return ''.join(parts)
+
+
+class Watchdog:
+    """Фоновый поток, который следит, что бот не завис.
+
+    check() возвращает описание зависания или None. При зависании
+    сторож пишет в лог стеки всех потоков, а при action='exit' завершает
+    процесс, чтобы его перезапустили dyno или supervisor.
+    """
+
+    def __init__(self, check, interval: float = WATCHDOG_INTERVAL,
+                 action: str = WATCHDOG_ACTION) -> None:
+        self.check = check
+        self.interval = interval
+        self.action = action
+        self.stalled = None
+        self._stop = threading.Event()
+
+    def inspect(self) -> None:
+        """Одна проверка; выполняется в потоке сторожа."""
+        reason = self.check()
+        if reason is None:
+            if self.stalled is not None:
+                logger.warning('Бот снова работает после зависания')
+            self.stalled = None
+            return
+        if self.stalled is not None:
+            return
+        self.stalled = reason
+        logger.critical('Бот завис: %s\n%s', reason, dump_threads())
+        if self.action == 'exit':
+            logging.shutdown()
+            os._exit(WATCHDOG_EXIT_CODE)
+
+    def run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.inspect()
+            except Exception as error:
+                logger.error('Ошибка сторожа: %s', error)
+
+    def start(self) -> None:
+        """Запускает сторожа в фоновом потоке."""
+        threading.Thread(target=self.run, name='watchdog', daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def make_view(report, watchdog: Watchdog = None):
+    """Обработчик /health: JSON-отчёт и код 503 при зависании."""
+    def view(query: dict, body: bytes, headers) -> tuple:
+        data = report()
+        stalled = watchdog.stalled if watchdog else None
+        data['status'] = 'stalled' if stalled else 'ok'
+        if stalled:
+            data['reason'] = stalled
+        status = (
+            HTTPStatus.SERVICE_UNAVAILABLE if stalled else HTTPStatus.OK
+        )
+        return status, 'application/json', json.dumps(
+            data, ensure_ascii=False
+        ).encode()
+
+    return view
+
+
+def start_server(report, watchdog: Watchdog = None,
+                 host: str = HEALTH_HOST, port: str = HEALTH_PORT) -> None:
+    """Отдаёт состояние бота по адресу /health."""
+    endpoint = get_endpoint(host, port)
+    endpoint.route('GET', '/health', make_view(report, watchdog))
+    endpoint.start()
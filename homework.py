@@ -1,16 +1,23 @@
+import asyncio
 import os
 import logging
 import sys
+import threading
 import time
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
-from logging.handlers import RotatingFileHandler
+from typing import TYPE_CHECKING, Optional
 
-import requests
-import telegram
 from dotenv import load_dotenv
+from decoding import decode_api_body
 from exceptions import ConnectionError, MissingKeysInDictionary,\
     WrongAPIResponseCodeError
 
+# requests и telegram импортируются только там, где они нужны: так
+# неудачная проверка токенов завершает бота без загрузки тяжёлых библиотек.
+if TYPE_CHECKING:
+    import requests
+
 
 load_dotenv()
 
@@ -19,10 +26,23 @@ logger = logging.getLogger(__name__)
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
 
-RETRY_TIME = 600
+RETRY_TIME = int(os.getenv('RETRY_TIME', 600))
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 
+SUCCESS_CODES = (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED)
+RETRY_AFTER_CODES = (
+    HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE
+)
+
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 32))
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 8))
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 30))
+
+HTTP_SESSION = None
+
 
 HOMEWORK_VERDICT = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -33,38 +53,166 @@ HOMEWORK_VERDICT = {
 
 def send_message(bot, message):
     """Отправляет сообщение в Telegram чат."""
-    logger.info(f'Начинаем отправку сообщения в чат {TELEGRAM_CHAT_ID}')
+    return send_message_to(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to(bot, chat_id, message: str) -> bool:
+    """Отправляет сообщение в указанный Telegram чат.
+
+    Возвращает False, если отправить не удалось.
+    """
+    logger.info('Начинаем отправку сообщения в чат %s', chat_id)
     try:
-        logger.info(f'Отправляем сообщения в чат {TELEGRAM_CHAT_ID}')
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        logger.info('Отправляем сообщения в чат %s', chat_id)
+        bot.send_message(chat_id, message)
     except Exception as error:
         logging.error(error, exc_info=True)
-    finally:
-        logger.info(
-            'Сообщение успешно отправлено в чат'
-            f' {TELEGRAM_CHAT_ID}: {message}'
-        )
+        return False
+    logger.info('Сообщение успешно отправлено в чат %s: %s', chat_id, message)
+    return True
+
+
+def init_http_session(pool_connections: int = None,
+                      pool_maxsize: int = None) -> 'requests.Session':
+    """Создаёт общую сессию с пулом keep-alive соединений к API."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    global HTTP_SESSION
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or HTTP_POOL_MAXSIZE
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    HTTP_SESSION = session
+    return session
+
+
+def create_bot(**kwargs):
+    """Создаёт бота Telegram с пулом соединений к Bot API."""
+    import telegram
+    from telegram.utils.request import Request
+
+    request = Request(con_pool_size=TELEGRAM_POOL_SIZE)
+    return telegram.Bot(token=TELEGRAM_TOKEN, request=request, **kwargs)
+
+
+class LazyBot:
+    """Бот Telegram, который создаётся при первом обращении.
+
+    Первый опрос API не ждёт импорта python-telegram-bot: библиотека
+    загружается, только когда понадобится отправить сообщение.
+    send_message и get_updates создают бота при вызове, а не при
+    обращении к атрибуту, поэтому бот создаётся в потоке пула, где
+    выполняется вызов, и не блокирует цикл событий.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        """Запоминает аргументы для create_bot()."""
+        self._kwargs = kwargs
+        self._bot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Возвращает бота, создавая его при первом вызове."""
+        if self._bot is None:
+            with self._lock:
+                if self._bot is None:
+                    self._bot = create_bot(**self._kwargs)
+        return self._bot
+
+    def send_message(self, *args, **kwargs):
+        """Отправляет сообщение, создавая бота при необходимости."""
+        return self.get().send_message(*args, **kwargs)
+
+    def get_updates(self, *args, **kwargs):
+        """Получает обновления, создавая бота при необходимости."""
+        return self.get().get_updates(*args, **kwargs)
+
+    def __getattr__(self, name):
+        """Передаёт обращения к атрибутам настоящему боту."""
+        return getattr(self.get(), name)
 
 
 def get_api_answer(current_timestamp: int) -> dict:
     """Делает запрос и возвращает ответ API."""
-    headers: dict = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+    return request_api(PRACTICUM_TOKEN, current_timestamp)
+
+
+def request_api(token: str, current_timestamp: int) -> dict:
+    """Делает запрос с указанным токеном и возвращает ответ API."""
+    return decode_api_response(fetch_api_response(token, current_timestamp))
+
+
+def fetch_api_response(token: str, current_timestamp: int,
+                       extra_headers: dict = None) -> 'requests.Response':
+    """Делает запрос к API и возвращает ответ без разбора JSON.
+
+    Ответ 304 считается успешным: его получают только на условные
+    запросы с заголовками из extra_headers.
+    """
+    import requests
+
+    headers: dict = {'Authorization': f'OAuth {token}'}
+    if extra_headers:
+        headers.update(extra_headers)
     timestamp: int = current_timestamp or int(time.time())
     params: dict = {'from_date': timestamp}
     request_data: dict = {
-        'url': ENDPOINT, 'headers': headers, 'params': params
+        'url': ENDPOINT, 'headers': headers, 'params': params,
+        'timeout': REQUEST_TIMEOUT
     }
     try:
-        logger.info(f'Запрашиваем данные API у {ENDPOINT}')
-        response: requests.models.Response = requests.get(**request_data)
-        if response.status_code != HTTPStatus.OK:
-            raise WrongAPIResponseCodeError(f'Error {response.status_code}!')
+        logger.info('Запрашиваем данные API у %s', ENDPOINT)
+        http_get = (
+            HTTP_SESSION.get if HTTP_SESSION is not None else requests.get
+        )
+        response: requests.models.Response = http_get(**request_data)
+        if response.status_code not in SUCCESS_CODES:
+            raise WrongAPIResponseCodeError(
+                f'Error {response.status_code}!',
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response)
+            )
+        return response
+    except Exception as error:
+        raise ConnectionError(f'Ошибка при запросе к API: {error}') from error
+
+
+def decode_api_response(response: 'requests.Response') -> dict:
+    """Разбирает JSON из ответа API.
+
+    Тело разбирается тем же декодером, что и в кэше ответов. Только у
+    заглушек ответа без тела вызывается их json().
+    """
+    body = getattr(response, 'content', None)
+    if isinstance(body, bytes):
+        return decode_api_body(body)
+    try:
         return response.json()
     except Exception as error:
-        raise ConnectionError(f'Ошибка при запросе к API: {error}')
+        raise ConnectionError(f'Ошибка при запросе к API: {error}') from error
 
 
-def check_response(response: dict) -> dict:
+def parse_retry_after(response) -> Optional[float]:
+    """Возвращает паузу из заголовка Retry-After для ответов 429 и 503."""
+    if response.status_code not in RETRY_AFTER_CODES:
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def check_response(response: dict) -> list:
     """Проверяет ответ API и возвращает список домашних работ."""
     logger.info('Начинаем проверять ответ API')
     if not isinstance(response, dict):
@@ -75,39 +223,61 @@ def check_response(response: dict) -> dict:
                         f' а {type(response)}')
     if not all(k in response for k in ('homeworks', 'current_date')):
         raise MissingKeysInDictionary('Отсутствуют ключи в словаре')
-    if not list_works:
-        raise IndexError('Список домашних работ пуст')
-    homework: dict = list_works[0]
-    if not isinstance(homework, dict):
-        raise TypeError(f'{type(homework)} - неверный тип данных.')
-    return homework
+    for homework in list_works:
+        if not isinstance(homework, dict):
+            raise TypeError(f'{type(homework)} - неверный тип данных.')
+    return list_works
 
 
-def parse_status(homework: dict) -> str:
-    """Извлекает из информации о домашней работе статус этой работы."""
+def check_status(homework: dict) -> tuple:
+    """Проверяет работу из ответа API и возвращает её название и статус."""
     if 'homework_name' not in homework:
         raise KeyError('Отсутствует ключ "homework_name" в ответе API')
     if 'status' not in homework:
         raise Exception('Отсутствует ключ "status" в ответе API')
-    homework_name: str = homework['homework_name']
     homework_status: str = homework['status']
     if homework_status not in HOMEWORK_VERDICT:
         raise ValueError(f'Неизвестный статус работы: {homework_status}')
+    return homework['homework_name'], homework_status
+
+
+def parse_status(homework: dict) -> str:
+    """Извлекает из информации о домашней работе статус этой работы."""
+    homework_name, homework_status = check_status(homework)
     verdict: str = HOMEWORK_VERDICT[homework_status]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+class StatusMessage:
+    """Уведомление о смене статуса работы.
+
+    Хранит название работы и код статуса, а текст собирает только при
+    отправке, поэтому очередь и журнал не держат готовые строки.
+    """
+
+    __slots__ = ('homework_name', 'status')
+
+    def __init__(self, homework: dict) -> None:
+        """Проверяет работу так же, как parse_status()."""
+        self.homework_name, status = check_status(homework)
+        self.status = sys.intern(status)
+
+    def __str__(self) -> str:
+        """Текст уведомления."""
+        return parse_status({
+            'homework_name': self.homework_name, 'status': self.status
+        })
+
+
 def check_tokens():
     """Проверяет доступность переменных окружения."""
+    if SUBSCRIPTIONS_FILE:
+        return bool(TELEGRAM_TOKEN)
     return all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID))
 
 
 def main():
     """Основная логика работы бота."""
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    STATUS = ''
-    ERROR_CACHE_MESSAGE = ''
     if not check_tokens():
         message = (
             'Проверьте правильность заполнения этих токенов:'
@@ -115,39 +285,28 @@ def main():
         )
         logger.critical(message)
         sys.exit(message)
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            current_timestamp = response.get('current_date')
-            message = parse_status(check_response(response))
-            if message != STATUS:
-                send_message(bot, message)
-                STATUS = message
-            time.sleep(RETRY_TIME)
-        except Exception as error:
-            logger.error(f'Не удалось отправить сообщение. Ошибка: {error}')
-            message_t = str(error)
-            if message_t != ERROR_CACHE_MESSAGE:
-                send_message(bot, message_t)
-                ERROR_CACHE_MESSAGE = message_t
-        finally:
-            time.sleep(RETRY_TIME)
+    from engine import build_engine, load_subscriptions
+    from supervisor import WORKERS, Supervisor
+
+    subscriptions = load_subscriptions()
+    if WORKERS > 1:
+        Supervisor(subscriptions, WORKERS).run()
+        return
+    engine = build_engine(
+        subscriptions, subscription_source=load_subscriptions
+    )
+    asyncio.run(engine.run())
 
 
 if __name__ == '__main__':
-    """Глобальная конфигурация для всех логгеров."""
-    logging.basicConfig(
-        level=logging.DEBUG,
-        filename='main.log',
-        format='%(funcName)s, %(lineno)s, %(levelname)s, %(message)s',
-        encoding='UTF-8',
-        filemode='w'
-    )
-    handler = RotatingFileHandler(
-        'my_logger.log',
-        encoding='UTF-8',
-        maxBytes=50000000,
-        backupCount=5
-    )
-    logger.addHandler(handler)
-    main()
+    from logconfig import setup_logging
+
+    listener = setup_logging()
+    # Остальные модули импортируют homework, поэтому запускаем main()
+    # из него, а не из копии модуля под именем __main__.
+    from homework import main as run_bot
+    try:
+        run_bot()
+    finally:
+        if listener:
+            listener.stop()
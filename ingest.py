@@ -0,0 +1,103 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+from http import HTTPStatus
+
+from homework import check_response
+from webserver import get_endpoint
+
+
+logger = logging.getLogger(__name__)
+
+INGEST_HOST = os.getenv('INGEST_HOST', '127.0.0.1')
+INGEST_PORT = os.getenv('INGEST_PORT')
+INGEST_TOKEN = os.getenv('INGEST_TOKEN')
+ENABLED = bool(INGEST_PORT)
+
+JSON_TYPE = 'application/json; charset=utf-8'
+# Опрос API хранит работы по id, поэтому событие без id пришло бы
+# с другим ключом и повторило бы уведомление после сверки.
+EVENT_FIELDS = ('id', 'status')
+
+
+def _reply(status: HTTPStatus, **data) -> tuple:
+    return status, JSON_TYPE, json.dumps(data, ensure_ascii=False).encode()
+
+
+def make_view(find_subscriptions, dispatch, token: str = None):
+    """Создаёт обработчик POST /events.
+
+    Тело запроса — работа в том же виде, что элемент списка `homeworks`
+    ответа API, или список таких работ. Подписка задаётся параметром
+    `subscription` (ключ подписки) или `chat_id`. У каждой работы
+    обязательны `id` и `status`. Формат проверяется в потоке сервера,
+    а dispatch(подписка, работы) передаёт работы туда, где подписка
+    обрабатывается.
+    """
+
+    def view(query: dict, body: bytes, headers) -> tuple:
+        if token and not hmac.compare_digest(
+            headers.get('X-Ingest-Token', ''), token
+        ):
+            return _reply(HTTPStatus.UNAUTHORIZED, error='Неверный токен')
+        key = query.get('subscription', [None])[0]
+        chat_id = query.get('chat_id', [None])[0]
+        if key is None and chat_id is None:
+            return _reply(
+                HTTPStatus.BAD_REQUEST,
+                error='Укажите параметр subscription или chat_id'
+            )
+        subscriptions = find_subscriptions(key=key, chat_id=chat_id)
+        if not subscriptions:
+            return _reply(HTTPStatus.NOT_FOUND, error='Подписка не найдена')
+        try:
+            events = json.loads(body)
+            homeworks = check_response({
+                'homeworks': events if isinstance(events, list) else [events],
+                'current_date': None
+            })
+        except (ValueError, TypeError) as error:
+            return _reply(HTTPStatus.BAD_REQUEST, error=str(error))
+        for homework in homeworks:
+            missing = [
+                field for field in EVENT_FIELDS
+                if not isinstance(homework, dict) or field not in homework
+            ]
+            if missing:
+                return _reply(
+                    HTTPStatus.BAD_REQUEST,
+                    error=f'В событии нет полей: {", ".join(missing)}'
+                )
+        for subscription in subscriptions:
+            dispatch(subscription, homeworks)
+        logger.info(
+            'Принято событий: %s для подписок: %s',
+            len(homeworks), len(subscriptions)
+        )
+        return _reply(HTTPStatus.ACCEPTED, accepted=len(homeworks))
+
+    return view
+
+
+def engine_dispatcher(engine, loop: asyncio.AbstractEventLoop):
+    """Передаёт работы в цикл событий движка из потока сервера."""
+
+    def dispatch(subscription, homeworks: list) -> None:
+        asyncio.run_coroutine_threadsafe(
+            engine.ingest(subscription, homeworks), loop
+        )
+
+    return dispatch
+
+
+def start_server(find_subscriptions, dispatch,
+                 host: str = INGEST_HOST, port: str = INGEST_PORT,
+                 token: str = INGEST_TOKEN) -> None:
+    """Принимает события о статусах работ по адресу /events."""
+    endpoint = get_endpoint(host, port)
+    endpoint.route(
+        'POST', '/events', make_view(find_subscriptions, dispatch, token)
+    )
+    endpoint.start()
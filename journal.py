@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+from typing import Optional
+
+from homework import StatusMessage
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_JOURNAL = os.getenv('NOTIFY_JOURNAL', 'notifications.journal')
+JOURNAL_FLUSH_INTERVAL = float(os.getenv('JOURNAL_FLUSH_INTERVAL', 0.05))
+JOURNAL_COMPACT_SIZE = int(os.getenv('JOURNAL_COMPACT_SIZE', 1000))
+
+
+class JournalEntry:
+    """Запись о намерении отправить уведомление.
+
+    Для StatusMessage в файл пишется только название работы: статус уже
+    есть в ключе, а текст собирается заново при чтении журнала.
+    """
+
+    __slots__ = ('seq', 'key', 'chat_id', 'text')
+
+    def __init__(self, seq: int, key: tuple, chat_id, text: str) -> None:
+        self.seq = seq
+        self.key = key
+        self.chat_id = chat_id
+        self.text = text
+
+    def dump(self) -> bytes:
+        record = {'s': self.seq, 'k': list(self.key), 'c': self.chat_id}
+        if isinstance(self.text, StatusMessage):
+            record['n'] = self.text.homework_name
+        else:
+            record['t'] = str(self.text)
+        return _line(record)
+
+    @classmethod
+    def parse(cls, record: dict) -> 'JournalEntry':
+        """Восстанавливает запись из строки журнала."""
+        key = tuple(record['k'])
+        if 'n' in record:
+            text = StatusMessage({
+                'homework_name': record['n'], 'status': key[-1]
+            })
+        else:
+            text = record['t']
+        return cls(record['s'], key, record['c'], text)
+
+
+def _line(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False).encode() + b'\n'
+
+
+class NotificationJournal:
+    """Журнал уведомлений с упреждающей записью.
+
+    Перед отправкой уведомление записывается в журнал с ключом
+    идемпотентности (подписка, id работы, статус), после доставки —
+    подтверждение. Записи копятся в буфере, flush() дописывает их в файл
+    одним fsync на всю пачку. При запуске load() возвращает уведомления
+    без подтверждения, чтобы отправить их снова. Подтверждённые записи
+    хранятся, пока их статусы не сохранены в StateStore, затем compact()
+    переписывает журнал без них.
+
+    Буфер меняется только из одного потока, а write() и rewrite() не
+    должны выполняться одновременно.
+    """
+
+    def __init__(self, path: str = NOTIFY_JOURNAL) -> None:
+        self.path = path
+        self.sequence = 0
+        self.pending: dict = {}
+        self.acked: list = []
+        self._keys: set = set()
+        self._buffer: list = []
+        self._file = None
+
+    def load(self) -> list:
+        """Читает журнал и возвращает все записи в порядке номеров.
+
+        Неподтверждённые остаются в pending. Оборванная при падении
+        последняя строка пропускается.
+        """
+        entries: dict = {}
+        acked: set = set()
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as file:
+                for number, line in enumerate(file, 1):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(
+                            'Пропущена повреждённая строка %s журнала %s',
+                            number, self.path
+                        )
+                        continue
+                    if 'a' in record:
+                        acked.add(record['a'])
+                        continue
+                    entry = JournalEntry.parse(record)
+                    entries[entry.seq] = entry
+        entries = {seq: entries[seq] for seq in sorted(entries)}
+        for seq, entry in entries.items():
+            if seq in acked:
+                self.acked.append(entry)
+            else:
+                self.pending[seq] = entry
+                self._keys.add(entry.key)
+        self.sequence = max(entries, default=0)
+        self._file = open(self.path, 'ab')
+        return list(entries.values())
+
+    def record(self, key: tuple, chat_id, text: str) -> Optional[JournalEntry]:
+        """Добавляет уведомление в буфер журнала.
+
+        Возвращает None, если уведомление с тем же ключом ещё не доставлено.
+        """
+        if key in self._keys:
+            return None
+        self.sequence += 1
+        entry = JournalEntry(self.sequence, key, chat_id, text)
+        self.pending[entry.seq] = entry
+        self._keys.add(key)
+        self._buffer.append(entry.dump())
+        return entry
+
+    def ack(self, seq: int) -> None:
+        """Отмечает уведомление доставленным или окончательно отброшенным."""
+        entry = self.pending.pop(seq, None)
+        if entry is None:
+            return
+        self._keys.discard(entry.key)
+        self.acked.append(entry)
+        self._buffer.append(_line({'a': seq}))
+
+    def take(self) -> bytes:
+        """Забирает из буфера записи, ещё не переданные в write()."""
+        buffer, self._buffer = self._buffer, []
+        return b''.join(buffer)
+
+    def put_back(self, data: bytes) -> None:
+        """Возвращает в буфер записи, которые не удалось записать."""
+        self._buffer.insert(0, data)
+
+    def write(self, data: bytes) -> None:
+        """Дописывает записи в файл и ждёт их записи на диск."""
+        if not data:
+            return
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def flush(self) -> None:
+        """Записывает буфер одним fsync."""
+        data = self.take()
+        try:
+            self.write(data)
+        except Exception:
+            self.put_back(data)
+            raise
+
+    def snapshot(self, upto: int) -> bytes:
+        """Содержимое журнала без подтверждённых записей до upto включительно.
+
+        Снимок включает и буфер, поэтому буфер очищается.
+        """
+        self.acked = [entry for entry in self.acked if entry.seq > upto]
+        records: list = []
+        for entry in self.acked:
+            records.append(entry.dump())
+            records.append(_line({'a': entry.seq}))
+        records.extend(entry.dump() for entry in self.pending.values())
+        self._buffer = []
+        return b''.join(records)
+
+    def rewrite(self, data: bytes) -> None:
+        """Атомарно заменяет файл журнала снимком."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._file.close()
+        self._file = open(self.path, 'ab')
+
+    def compact(self, upto: int) -> None:
+        """Убирает подтверждённые записи с номером не больше upto.
+
+        Статусы этих уведомлений к этому моменту должны быть сохранены
+        в StateStore.
+        """
+        self.rewrite(self.snapshot(upto))
+
+    def close(self) -> None:
+        """Записывает буфер и закрывает файл."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+
+LOG_MODE = os.getenv('LOG_MODE', 'sync')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', 1))
+LOG_DIR = os.getenv('LOG_DIR', '.')
+
+TEXT_FORMAT = '%(funcName)s, %(lineno)s, %(levelname)s, %(message)s'
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает одну из rate INFO-записей с одинаковым шаблоном.
+
+    Шаблоном считается строка сообщения до подстановки аргументов,
+    поэтому ленивые %-аргументы не мешают группировке.
+    Предупреждения и ошибки проходят всегда.
+    """
+
+    def __init__(self, rate: int) -> None:
+        super().__init__()
+        self.rate = rate
+        self.counts: dict = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 1 or record.levelno != logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count % self.rate == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'func': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Кладёт запись в очередь без форматирования.
+
+    Стандартный QueueHandler форматирует сообщение в вызывающем потоке.
+    Слушатель работает в том же процессе, поэтому форматирование
+    можно оставить ему.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def make_formatter(log_format: str) -> logging.Formatter:
+    """Возвращает форматтер по имени формата: text или json."""
+    if log_format == 'json':
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def make_handlers(log_dir: str, log_format: str, suffix: str = '') -> list:
+    """Файловые обработчики бота: main.log и my_logger.log с ротацией.
+
+    suffix добавляется к именам файлов, например для рабочих процессов.
+    """
+    formatter = make_formatter(log_format)
+    main_handler = logging.FileHandler(
+        os.path.join(log_dir, f'main{suffix}.log'), mode='w',
+        encoding='UTF-8'
+    )
+    rotating_handler = RotatingFileHandler(
+        os.path.join(log_dir, f'my_logger{suffix}.log'),
+        encoding='UTF-8',
+        maxBytes=50000000,
+        backupCount=5
+    )
+    rotating_handler.addFilter(logging.Filter('homework'))
+    for handler in (main_handler, rotating_handler):
+        handler.setFormatter(formatter)
+    return [main_handler, rotating_handler]
+
+
+def setup_logging(mode: str = LOG_MODE, level: str = LOG_LEVEL,
+                  log_format: str = LOG_FORMAT,
+                  sample_rate: int = LOG_SAMPLE_RATE,
+                  log_dir: str = LOG_DIR,
+                  suffix: str = '') -> Optional[QueueListener]:
+    """Глобальная конфигурация для всех логгеров.
+
+    В режиме sync записи пишутся в файлы в вызывающем потоке. В режиме
+    queue они передаются через очередь в QueueListener, который пишет
+    их в отдельном потоке; слушатель возвращается, чтобы его можно было
+    остановить и дописать очередь при завершении.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    handlers = make_handlers(log_dir, log_format, suffix)
+    if mode != 'queue':
+        for handler in handlers:
+            handler.addFilter(SamplingFilter(sample_rate))
+            root.addHandler(handler)
+        return None
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    root.addHandler(queue_handler)
+    listener = QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return listener
@@ -0,0 +1,243 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+from http import HTTPStatus
+
+from webserver import get_endpoint
+
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = os.getenv('METRICS_PORT')
+ENABLED = bool(METRICS_PORT)
+
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+LOOP_LAG_INTERVAL = 1.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Счётчик с метками."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name + _labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    """Значение, которое может уменьшаться.
+
+    aggregate задаёт, как объединять значения рабочих процессов:
+    sum или max.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 aggregate: str = 'sum') -> None:
+        super().__init__(name, help, labels)
+        self.aggregate = aggregate
+
+    def set(self, value: float, *labels) -> None:
+        with self._lock:
+            self.values[labels] = value
+
+
+class Histogram(Counter):
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 3)
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        for labels, counts in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield self.name + '_bucket' + _labels(
+                    self.label_names, labels, f'le="{bound}"'
+                ), cumulative
+            yield self.name + '_bucket' + _labels(
+                self.label_names, labels, 'le="+Inf"'
+            ), counts[-1]
+            yield self.name + '_sum' + _labels(
+                self.label_names, labels
+            ), counts[-2]
+            yield self.name + '_count' + _labels(
+                self.label_names, labels
+            ), counts[-1]
+
+
+class Registry:
+    """Набор метрик и функций, собирающих значения при выгрузке."""
+
+    def __init__(self) -> None:
+        self.metrics: list = []
+        self.collectors: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Добавляет функцию, обновляющую метрики перед выгрузкой."""
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """Значения всех метрик для передачи в другой процесс."""
+        for collector in self.collectors:
+            collector()
+        return {metric.name: dict(metric.values) for metric in self.metrics}
+
+    def merge(self, snapshots: list) -> None:
+        """Заменяет значения метрик объединением снимков процессов."""
+        for metric in self.metrics:
+            merged: dict = {}
+            for snapshot in snapshots:
+                for labels, value in snapshot.get(metric.name, {}).items():
+                    current = merged.get(labels)
+                    if current is None:
+                        merged[labels] = value
+                    elif isinstance(value, list):
+                        merged[labels] = [
+                            a + b for a, b in zip(current, value)
+                        ]
+                    elif getattr(metric, 'aggregate', 'sum') == 'max':
+                        merged[labels] = max(current, value)
+                    else:
+                        merged[labels] = current + value
+            metric.values = merged
+
+    def render(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus."""
+        for collector in self.collectors:
+            collector()
+        lines: list = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(f'{name} {value}' for name, value in metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'homework_bot_stage_seconds', 'Длительность этапов обработки.',
+    ('stage',)
+))
+STAGE_TOTAL = REGISTRY.register(Counter(
+    'homework_bot_stage_total', 'Количество выполненных этапов.', ('stage',)
+))
+ERRORS_TOTAL = REGISTRY.register(Counter(
+    'homework_bot_errors_total', 'Ошибки по классам исключений.',
+    ('stage', 'error')
+))
+LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    'homework_bot_loop_lag_seconds', 'Задержка цикла событий.'
+))
+
+
+class _NullTimer:
+    """Таймер-заглушка для отключённых метрик."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.stage)
+        STAGE_TOTAL.inc(self.stage)
+        if error is not None:
+            count_error(self.stage, error)
+        return False
+
+
+def timer(stage: str):
+    """Замеряет длительность этапа и считает его ошибки."""
+    if not ENABLED:
+        return NULL_TIMER
+    return _StageTimer(stage)
+
+
+def count_error(stage: str, error: BaseException) -> None:
+    """Учитывает ошибку этапа по классу исключения и его причины."""
+    if not ENABLED:
+        return
+    ERRORS_TOTAL.inc(stage, type(error).__name__)
+    if error.__cause__ is not None:
+        ERRORS_TOTAL.inc(stage, type(error.__cause__).__name__)
+
+
+async def measure_loop_lag(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """Измеряет, насколько позже заданного просыпается цикл событий."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(loop.time() - started - interval, 0))
+
+
+def _metrics_view(query: dict, body: bytes, headers) -> tuple:
+    return HTTPStatus.OK, CONTENT_TYPE, REGISTRY.render().encode()
+
+
+def start_server(host: str = METRICS_HOST, port: str = METRICS_PORT) -> None:
+    """Отдаёт метрики по адресу /metrics."""
+    endpoint = get_endpoint(host, port)
+    endpoint.route('GET', '/metrics', _metrics_view)
+    endpoint.start()
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import metrics
+from ratelimit import TokenBucket
+
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+TELEGRAM_GROUP_RATE = float(os.getenv('TELEGRAM_GROUP_RATE', 20 / 60))
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 4))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+LATENCY_WINDOW = 1024
+
+
+def is_group(chat_id) -> bool:
+    """Проверяет, что чат групповой: у групп отрицательные id."""
+    try:
+        return int(chat_id) < 0
+    except (TypeError, ValueError):
+        return False
+
+
+class OutboundMessage:
+    """Сообщение в очереди на отправку.
+
+    text — строка или объект, текст которого собирается str() при
+    отправке, например homework.StatusMessage. reserved — место в лимите
+    чата для очередной попытки уже занято.
+    """
+
+    __slots__ = ('chat_id', 'text', 'key', 'created', 'attempts', 'reserved')
+
+    def __init__(self, chat_id, text: str, key=None) -> None:
+        self.chat_id = chat_id
+        self.text = text
+        self.key = key
+        self.created = time.monotonic()
+        self.attempts = 0
+        self.reserved = False
+
+
+class OutboundQueue:
+    """Очередь исходящих сообщений Telegram с ограничением частоты.
+
+    Опрос API только кладёт сообщения в очередь, а отправкой занимаются
+    отдельные воркеры. Общий лимит Bot API и лимит на каждый чат
+    соблюдаются через token bucket, сообщения с ответом RetryAfter
+    возвращаются в очередь после указанной паузы. Сообщение, которому
+    нужно дождаться лимита своего чата, откладывается без участия
+    воркера, поэтому занятый чат не задерживает остальные.
+
+    on_done, если задан, вызывается с сообщением, когда оно доставлено
+    или отброшено без повторов.
+    """
+
+    def __init__(self, bot, executor=None,
+                 workers: int = OUTBOX_WORKERS, on_done=None) -> None:
+        self.bot = bot
+        self.on_done = on_done
+        self.workers = workers
+        self._queue = None
+        self.global_bucket = TokenBucket(
+            TELEGRAM_GLOBAL_RATE, TELEGRAM_GLOBAL_RATE
+        )
+        self.chat_buckets: dict = {}
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.delayed = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.last_sent: dict = {}
+        self._executor = executor
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        """Очередь создаётся в работающем цикле событий."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    @property
+    def depth(self) -> int:
+        """Количество сообщений, ожидающих отправки."""
+        return self._queue.qsize() if self._queue else 0
+
+    def put(self, chat_id, text: str, key=None) -> None:
+        """Ставит сообщение в очередь на отправку.
+
+        key — номер записи в журнале уведомлений, если она есть.
+        """
+        self.queue.put_nowait(OutboundMessage(chat_id, text, key))
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = (
+                TELEGRAM_GROUP_RATE if is_group(chat_id)
+                else TELEGRAM_CHAT_RATE
+            )
+            bucket = self.chat_buckets[chat_id] = TokenBucket(rate, 1)
+        return bucket
+
+    async def _send(self, message: OutboundMessage) -> None:
+        await self.global_bucket.acquire()
+        loop = asyncio.get_running_loop()
+        with metrics.timer('send_message'):
+            await loop.run_in_executor(
+                self._executor, self.bot.send_message,
+                message.chat_id, str(message.text)
+            )
+
+    def _defer(self, message: OutboundMessage, delay: float) -> None:
+        self.delayed += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, message)
+
+    def _retry(self, message: OutboundMessage, delay: float) -> None:
+        self.retried += 1
+        message.reserved = False
+        self._defer(message, delay)
+
+    def _requeue(self, message: OutboundMessage) -> None:
+        self.delayed -= 1
+        self.queue.put_nowait(message)
+
+    async def _deliver(self, message: OutboundMessage) -> None:
+        message.attempts += 1
+        try:
+            await self._send(message)
+        except Exception as error:
+            self._on_error(message, error)
+            return
+        self.sent += 1
+        self.latencies.append(time.monotonic() - message.created)
+        self.last_sent[message.chat_id] = time.time()
+        logger.info('Сообщение успешно отправлено в чат %s', message.chat_id)
+        self._done(message)
+
+    def _done(self, message: OutboundMessage) -> None:
+        if self.on_done is not None:
+            self.on_done(message)
+
+    def _on_error(self, message: OutboundMessage, error: Exception) -> None:
+        # Ошибки Telegram импортируются только при неудачной отправке,
+        # когда бот уже загрузил библиотеку.
+        from telegram.error import (BadRequest, ChatMigrated, NetworkError,
+                                    RetryAfter, Unauthorized)
+
+        if isinstance(error, RetryAfter):
+            logger.warning(
+                'Превышен лимит Telegram, повтор через %s с',
+                error.retry_after
+            )
+            self._retry(message, error.retry_after)
+        elif isinstance(error, (BadRequest, ChatMigrated, Unauthorized)):
+            self.failed += 1
+            logger.error(
+                'Сообщение в чат %s не доставлено: %s', message.chat_id, error
+            )
+            self._done(message)
+        elif isinstance(error, (NetworkError, OSError)):
+            if message.attempts < OUTBOX_MAX_ATTEMPTS:
+                logger.warning(
+                    'Ошибка отправки в чат %s: %s', message.chat_id, error
+                )
+                self._retry(message, 2 ** message.attempts)
+            else:
+                self.failed += 1
+                logger.error(
+                    'Сообщение в чат %s не доставлено после %s попыток: %s',
+                    message.chat_id, message.attempts, error
+                )
+                self._done(message)
+        else:
+            self.failed += 1
+            logger.error(error, exc_info=True)
+            self._done(message)
+
+    async def worker(self) -> None:
+        """Отправляет сообщения из очереди."""
+        while True:
+            message = await self.queue.get()
+            try:
+                if not message.reserved:
+                    message.reserved = True
+                    delay = self._chat_bucket(message.chat_id).reserve()
+                    if delay:
+                        self._defer(message, delay)
+                        continue
+                await self._deliver(message)
+            finally:
+                self.queue.task_done()
+
+    async def run(self) -> None:
+        """Запускает воркеры отправки."""
+        await asyncio.gather(*(self.worker() for _ in range(self.workers)))
+
+    async def join(self) -> None:
+        """Ждёт, пока очередь опустеет, включая отложенные повторы."""
+        await self.queue.join()
+        while self.delayed:
+            await asyncio.sleep(0.1)
+            await self.queue.join()
+
+    def stats(self) -> dict:
+        """Возвращает глубину очереди и задержку доставки."""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            'depth': self.depth,
+            'delayed': self.delayed,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'latency_p50': latencies[count // 2] if count else 0.0,
+            'latency_p99': latencies[int(count * 0.99)] if count else 0.0,
+            'latency_max': latencies[-1] if count else 0.0,
+        }
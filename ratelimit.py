@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Ограничитель частоты по алгоритму token bucket.
+
+    Токены можно резервировать в долг: `reserve()` сразу возвращает,
+    сколько нужно подождать, поэтому ожидающие обслуживаются по очереди.
+    """
+
+    def __init__(self, rate: float, capacity: float,
+                 clock=time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Забирает токен и возвращает паузу до его появления."""
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def acquire(self) -> float:
+        """Ждёт токен и возвращает время ожидания."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
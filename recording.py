@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+
+import homework
+from breaker import PassThrough
+from exceptions import ConnectionError, WrongAPIResponseCodeError
+from fingerprint import token_fingerprint
+from singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+RECORD_FILE = os.getenv('RECORD_FILE')
+RECORDED_HEADERS = ('ETag', 'Last-Modified', 'Retry-After')
+RECORD_VERSION = 1
+
+
+def _line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+class Recorder:
+    """Записывает ответы API и отправленные сообщения в файл.
+
+    Файл — JSON-строки, сжатые gzip. Каждый запуск начинается с записи
+    {'v': версия, 'started': время}, у событий 't' — секунды от начала
+    запуска. Запрос к API: 'api' — отпечаток токена, 'from' — from_date,
+    'status', 'h' — заголовки кэширования, 'body' — тело ответа или
+    'error' при ошибке. Отправка: 'send' — чат, 'text' — текст сообщения.
+    'subs' — подписки с from_date и известными статусами на момент
+    запуска или перечитывания по SIGHUP. Токены в файл не попадают.
+    """
+
+    def __init__(self, path: str = RECORD_FILE, clock=time.monotonic) -> None:
+        # gzip нужен только при записи, поэтому не замедляет запуск бота.
+        import gzip
+
+        self.path = path
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._file.write(_line({'v': RECORD_VERSION, 'started': time.time()}))
+
+    def event(self, record: dict) -> None:
+        """Дописывает событие с отметкой времени."""
+        record['t'] = round(self._clock() - self._started, 3)
+        line = _line(record)
+        with self._lock:
+            self._file.write(line)
+
+    def subscriptions(self, subscriptions: list, states: dict) -> None:
+        """Записывает подписки и состояние их опроса."""
+        snapshot = []
+        for subscription in subscriptions:
+            state = states.get(subscription.key)
+            if state is None:
+                continue
+            snapshot.append([
+                subscription.token_key, subscription.chat_id,
+                state.from_date, list(state.tracker.statuses.items())
+            ])
+        self.event({'subs': snapshot})
+
+    def send(self, chat_id, text: str, error: Exception = None) -> None:
+        """Записывает отправку сообщения."""
+        record = {'send': chat_id, 'text': text}
+        if error is not None:
+            record['error'] = str(error)
+        self.event(record)
+
+    def wrap_fetch(self, fetch):
+        """Оборачивает homework.fetch_api_response записью ответов."""
+        def recorded_fetch(token, current_timestamp, extra_headers=None):
+            record = {
+                'api': token_fingerprint(token), 'from': current_timestamp
+            }
+            try:
+                response = fetch(token, current_timestamp, extra_headers)
+            except Exception as error:
+                record['error'] = str(error)
+                cause = error.__cause__
+                if isinstance(cause, WrongAPIResponseCodeError):
+                    record['status'] = cause.status_code
+                    record['retry_after'] = cause.retry_after
+                self.event(record)
+                raise
+            record['status'] = response.status_code
+            headers = {
+                name: response.headers[name] for name in RECORDED_HEADERS
+                if name in response.headers
+            }
+            if headers:
+                record['h'] = headers
+            record['body'] = response.content.decode('utf-8', 'replace')
+            self.event(record)
+            return response
+        return recorded_fetch
+
+    def close(self) -> None:
+        """Дописывает сжатые данные и закрывает файл."""
+        with self._lock:
+            self._file.close()
+
+
+class RecordingBot:
+    """Бот, записывающий отправленные сообщения."""
+
+    def __init__(self, bot, recorder: Recorder) -> None:
+        self.bot = bot
+        self.recorder = recorder
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        """Отправляет сообщение и записывает его вместе с ошибкой."""
+        try:
+            result = self.bot.send_message(chat_id, text, *args, **kwargs)
+        except Exception as error:
+            self.recorder.send(chat_id, text, error)
+            raise
+        self.recorder.send(chat_id, text)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.bot, name)
+
+
+def start_recording(path: str, bot):
+    """Включает запись ответов API и возвращает бота и Recorder."""
+    recorder = Recorder(path)
+    homework.fetch_api_response = recorder.wrap_fetch(
+        homework.fetch_api_response
+    )
+    logger.info('Запись запросов к API и сообщений в %s', path)
+    return RecordingBot(bot, recorder), recorder
+
+
+def load_recording(path: str) -> list:
+    """Читает запись и переводит отметки событий во время Unix.
+
+    Обрезанный при аварийной остановке хвост пропускается.
+    """
+    import gzip
+
+    records: list = []
+    started = 0.0
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                record = json.loads(line)
+                if 'v' in record:
+                    started = record['started']
+                    continue
+                record['at'] = started + record.pop('t')
+                records.append(record)
+    except (EOFError, zlib.error, ValueError) as error:
+        logger.warning('Запись %s обрезана: %s', path, error)
+    return records
+
+
+class ReplayResponse:
+    """Записанный ответ API с интерфейсом requests.Response."""
+
+    def __init__(self, record: dict) -> None:
+        self.status_code = record['status']
+        self.headers = record.get('h', {})
+        self.content = record.get('body', '').encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def replay_error(record: dict) -> Exception:
+    """Восстанавливает исключение записанного запроса."""
+    error = ConnectionError(record['error'])
+    if record.get('status') is not None:
+        error.__cause__ = WrongAPIResponseCodeError(
+            f'Error {record["status"]}!', status_code=record['status'],
+            retry_after=record.get('retry_after')
+        )
+    return error
+
+
+class Replayer:
+    """Проигрывает запись через логику движка опроса без сети.
+
+    Каждый записанный ответ API подаётся в PollingEngine.poll_once тех
+    подписок токена, чей from_date совпадает с записанным запросом, —
+    так же, как схлопнутый запрос обслуживал их при записи. Уведомления
+    забираются из очереди отправки, не доходя до Telegram, и сверяются
+    с записанными отправками.
+
+    Общие для процесса предохранитель и схлопывание запросов не
+    используются: подписки проигрываются по очереди и разомкнули бы
+    предохранитель раньше, чем при записи, а пока он был разомкнут,
+    запросы не записывались. Уведомления о разомкнутом предохранителе,
+    как и сводки ошибок, попадают в missing.
+
+    speed — во сколько раз быстрее записи идёт проигрывание, 0 — без
+    пауз. Кэш ошибок работает в реальном времени, поэтому при ускорении
+    ошибки подавляются дольше, чем при записи.
+    """
+
+    def __init__(self, records: list, speed: float = 0) -> None:
+        self.records = records
+        self.speed = speed
+        self.sent: list = []
+        self.recorded: list = []
+        self.polls = 0
+        self.mismatched = 0
+        self._responses: dict = {}
+
+    def _fetch(self, token, current_timestamp, extra_headers=None):
+        record = self._responses[token]
+        if 'error' in record:
+            raise replay_error(record)
+        return ReplayResponse(record)
+
+    def _collect(self, polling) -> None:
+        queue = polling.outbox.queue
+        while not queue.empty():
+            message = queue.get_nowait()
+            queue.task_done()
+            self.sent.append((message.chat_id, str(message.text)))
+
+    @staticmethod
+    def _subscribe(polling, by_token: dict, snapshot: list) -> None:
+        from engine import Subscription
+
+        for token_key, chat_id, from_date, statuses in snapshot:
+            # Вместо токена у подписки отпечаток: запросы идут не в API.
+            subscription = Subscription(token_key, chat_id)
+            if subscription.key in polling.states:
+                continue
+            polling.new_state(subscription, from_date, dict(statuses))
+            by_token.setdefault(token_key, []).append(subscription)
+
+    async def run(self) -> dict:
+        """Проигрывает запись и возвращает сводку."""
+        from engine import PollingEngine
+
+        polling = PollingEngine(
+            None, [], serve_http=False, api_rate=0,
+            breaker=PassThrough(), flights=SingleFlight()
+        )
+        by_token: dict = {}
+        fetch = homework.fetch_api_response
+        homework.fetch_api_response = self._fetch
+        previous = None
+        try:
+            for record in self.records:
+                if self.speed and previous is not None:
+                    await asyncio.sleep(
+                        max(record['at'] - previous, 0) / self.speed
+                    )
+                previous = record['at']
+                if 'subs' in record:
+                    self._subscribe(polling, by_token, record['subs'])
+                elif 'send' in record:
+                    if 'error' not in record:
+                        self.recorded.append((record['send'], record['text']))
+                elif 'api' in record:
+                    await self._poll(polling, by_token, record)
+        finally:
+            homework.fetch_api_response = fetch
+            polling._executor.shutdown()
+            polling._journal_executor.shutdown()
+        return self.report()
+
+    async def _poll(self, polling, by_token: dict, record: dict) -> None:
+        subscriptions = by_token.get(record['api'], [])
+        targets = [
+            subscription for subscription in subscriptions
+            if polling.states[subscription.key].from_date == record['from']
+        ]
+        if not targets:
+            previous = self._responses.get(record['api'])
+            if previous and previous['from'] == record['from']:
+                # Несхлопнутый повтор запроса, уже поданного подпискам.
+                return
+            self.mismatched += 1
+            targets = subscriptions
+        self._responses[record['api']] = record
+        for subscription in targets:
+            await polling.poll_once(
+                subscription, polling.states[subscription.key]
+            )
+            self.polls += 1
+        self._collect(polling)
+
+    def report(self) -> dict:
+        """Сравнивает уведомления проигрывания с записанными отправками."""
+        replayed = Counter(self.sent)
+        recorded = Counter(self.recorded)
+        return {
+            'polls': self.polls,
+            'replayed': len(self.sent),
+            'recorded': len(self.recorded),
+            'missing': sum((recorded - replayed).values()),
+            'extra': sum((replayed - recorded).values()),
+            'from_date_mismatches': self.mismatched,
+        }
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import random
+from typing import Optional
+
+from exceptions import ConnectionError, WrongAPIResponseCodeError
+
+
+POLL_MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 60))
+POLL_MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', 3600))
+BACKOFF_BASE = float(os.getenv('BACKOFF_BASE', 30))
+POLL_JITTER = float(os.getenv('POLL_JITTER', 0.1))
+
+BACKOFF_ERRORS = (ConnectionError, WrongAPIResponseCodeError)
+
+_MASK64 = 2 ** 64 - 1
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Ищет паузу Retry-After в исключении и в его причинах."""
+    while error is not None:
+        delay = getattr(error, 'retry_after', None)
+        if delay is not None:
+            return delay
+        error = error.__cause__
+    return None
+
+
+class SeededRandom:
+    """Детерминированный генератор случайных чисел splitmix64.
+
+    Одинаковый seed даёт одинаковую последовательность. Занимает несколько
+    десятков байт вместо нескольких килобайт состояния random.Random,
+    поэтому подходит для отдельного генератора у каждой подписки.
+    """
+
+    __slots__ = ('state',)
+
+    def __init__(self, seed: str) -> None:
+        self.state = int.from_bytes(
+            hashlib.blake2b(seed.encode(), digest_size=8).digest(), 'big'
+        )
+
+    def __call__(self) -> float:
+        self.state = (self.state + 0x9E3779B97F4A7C15) & _MASK64
+        value = self.state
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return ((value ^ (value >> 31)) >> 11) / 2 ** 53
+
+
+class PollScheduler:
+    """Вычисляет паузу до следующего опроса одной подписки.
+
+    После смены статуса опрашивает чаще, постепенно возвращаясь к обычному
+    интервалу. При сетевых ошибках увеличивает паузу экспоненциально со
+    случайным разбросом и соблюдает Retry-After из ответов 429 и 503.
+
+    Первая пауза после успешного опроса — случайная фаза внутри интервала,
+    а остальные паузы отклоняются от расчётных на долю jitter, поэтому
+    подписки, запущенные вместе, расходятся по всему интервалу. С rand
+    от SeededRandom(токен) подписки одного токена получают одну фазу и
+    продолжают опрашиваться одним запросом.
+    """
+
+    __slots__ = (
+        'min_interval', 'max_interval', 'interval', 'backoff_base',
+        'jitter', 'failures', 'current', '_rand', '_phased'
+    )
+
+    def __init__(self, interval: float, min_interval: float = None,
+                 max_interval: float = None, backoff_base: float = None,
+                 rand=random.random, jitter: float = None) -> None:
+        self.failures = 0
+        self.current = None
+        self._rand = rand
+        self._phased = False
+        self.configure(
+            interval, min_interval, max_interval, backoff_base, jitter
+        )
+
+    def configure(self, interval: float, min_interval: float = None,
+                  max_interval: float = None,
+                  backoff_base: float = None,
+                  jitter: float = None) -> None:
+        """Задаёт интервалы опроса.
+
+        Не указанные значения берутся из настроек модуля, поэтому после
+        их перечитывания по SIGHUP достаточно вызвать configure(interval).
+        """
+        if min_interval is None:
+            min_interval = POLL_MIN_INTERVAL
+        if max_interval is None:
+            max_interval = POLL_MAX_INTERVAL
+        if backoff_base is None:
+            backoff_base = BACKOFF_BASE
+        if jitter is None:
+            jitter = POLL_JITTER
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.interval = self._clamp(interval)
+        self.backoff_base = backoff_base
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.current = (
+            self.interval if self.current is None
+            else min(self.current, self.interval)
+        )
+
+    def _clamp(self, delay: float) -> float:
+        return min(max(delay, self.min_interval), self.max_interval)
+
+    def on_success(self, changed: bool) -> float:
+        """Возвращает паузу после успешного опроса."""
+        self.failures = 0
+        if changed:
+            self.current = self.min_interval
+        else:
+            self.current = min(self.current * 2, self.interval)
+        if not self._phased:
+            self._phased = True
+            if not changed:
+                return self._clamp(self._rand() * self.interval)
+        return self._clamp(
+            self.current * (1 + self.jitter * (2 * self._rand() - 1))
+        )
+
+    def on_error(self, error: Exception) -> float:
+        """Возвращает паузу после ошибки опроса."""
+        if not isinstance(error, BACKOFF_ERRORS):
+            return self.interval
+        self.failures += 1
+        delay = retry_after(error)
+        if delay is not None:
+            return max(delay, self.min_interval)
+        backoff = min(
+            self.backoff_base * 2 ** (self.failures - 1), self.max_interval
+        )
+        return self._clamp(backoff / 2 + self._rand() * backoff / 2)
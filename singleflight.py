@@ -0,0 +1,62 @@
+import threading
+
+
+class _Call:
+    """Выполняющийся вызов, результат которого ждут другие потоки."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Схлопывает одновременные одинаковые вызовы в один.
+
+    Поток, первым начавший вызов с данным ключом, выполняет его, а потоки,
+    пришедшие с тем же ключом до его завершения, ждут и получают тот же
+    результат или то же исключение.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args):
+        """Вызывает func(*args) или ждёт такой же вызов с ключом key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """Число выполненных и присоединённых вызовов и доля дублей."""
+        total = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'ratio': self.coalesced / total if total else 0.0,
+        }
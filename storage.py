@@ -0,0 +1,92 @@
+import os
+import sqlite3
+
+
+STATE_DB = os.getenv('STATE_DB', 'state.sqlite3')
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL', 1))
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS subscriptions ('
+    ' key TEXT PRIMARY KEY, from_date INTEGER'
+    ') WITHOUT ROWID',
+    # Столбец homework без типа: id работы остаётся int, название — str.
+    'CREATE TABLE IF NOT EXISTS statuses ('
+    ' key TEXT, homework, status TEXT, name TEXT,'
+    ' PRIMARY KEY (key, homework)'
+    ') WITHOUT ROWID',
+)
+
+
+class StateStore:
+    """Хранит состояние опроса подписок в SQLite между перезапусками."""
+
+    def __init__(self, path: str = STATE_DB) -> None:
+        # timeout: при работе через supervisor базу делят несколько процессов.
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+            columns = [
+                row[1] for row in
+                self._connection.execute('PRAGMA table_info(statuses)')
+            ]
+            # Базы, созданные до появления названий работ.
+            if 'name' not in columns:
+                self._connection.execute(
+                    'ALTER TABLE statuses ADD COLUMN name TEXT'
+                )
+
+    def load(self) -> dict:
+        """Возвращает состояние подписок.
+
+        {ключ подписки: (from_date, {работа: статус}, {работа: название})}.
+        """
+        states: dict = {
+            key: (from_date, {}, {})
+            for key, from_date in self._connection.execute(
+                'SELECT key, from_date FROM subscriptions'
+            )
+        }
+        for key, homework, status, name in self._connection.execute(
+            'SELECT key, homework, status, name FROM statuses'
+        ):
+            _, statuses, names = states.setdefault(key, (None, {}, {}))
+            statuses[homework] = status
+            if name is not None:
+                names[homework] = name
+        return states
+
+    def save(self, subscriptions: list, statuses: list) -> None:
+        """Записывает изменившиеся строки одной транзакцией.
+
+        subscriptions — список (ключ, from_date),
+        statuses — список (ключ, работа, статус, название).
+        """
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO subscriptions VALUES (?, ?)',
+                subscriptions
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?)',
+                statuses
+            )
+
+    def add_statuses(self, statuses: list) -> None:
+        """Добавляет статусы работ, не перезаписывая уже сохранённые.
+
+        statuses — список (ключ, работа, статус) без названий.
+        """
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO statuses (key, homework, status) '
+                'VALUES (?, ?, ?)', statuses
+            )
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
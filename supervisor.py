@@ -0,0 +1,351 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+import health
+import ingest
+import metrics
+
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv('WORKERS', 1))
+HASH_RING_REPLICAS = 160
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+METRICS_REPORT_INTERVAL = 5.0
+INBOX_POLL_INTERVAL = 1.0
+# Воркер по SIGTERM отправляет очередь до engine.SHUTDOWN_TIMEOUT секунд.
+WORKER_STOP_TIMEOUT = float(os.getenv('WORKER_STOP_TIMEOUT', 30))
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо консистентного хеширования подписок по рабочим процессам.
+
+    Каждый процесс занимает HASH_RING_REPLICAS точек на кольце, поэтому
+    при добавлении или удалении процесса переезжает примерно 1/N подписок.
+    """
+
+    def __init__(self, nodes=(), replicas: int = HASH_RING_REPLICAS) -> None:
+        self.replicas = replicas
+        self._hashes: list = []
+        self._nodes: list = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node) -> None:
+        for replica in range(self.replicas):
+            point = _hash(f'{node}#{replica}')
+            index = bisect.bisect(self._hashes, point)
+            self._hashes.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove(self, node) -> None:
+        pairs = [
+            (point, owner) for point, owner in zip(self._hashes, self._nodes)
+            if owner != node
+        ]
+        self._hashes = [point for point, _ in pairs]
+        self._nodes = [owner for _, owner in pairs]
+
+    def get(self, key: str):
+        """Возвращает процесс, которому принадлежит ключ."""
+        if not self._hashes:
+            raise LookupError('В кольце нет рабочих процессов')
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def join_process(process, timeout: float = WORKER_STOP_TIMEOUT) -> None:
+    """Ждёт завершения процесса и убивает его, если он завис."""
+    process.join(timeout)
+    if process.is_alive():
+        logger.error(
+            'Процесс %s не завершился за %s с, завершаем принудительно',
+            process.pid, timeout
+        )
+        process.kill()
+        process.join()
+
+
+def assign(subscriptions: list, ring: HashRing) -> dict:
+    """Распределяет подписки по процессам кольца.
+
+    Подписки одного токена попадают в один процесс, чтобы их опросы
+    схлопывались в один запрос к API.
+    """
+    shards: dict = {}
+    for subscription in subscriptions:
+        shards.setdefault(
+            ring.get(subscription.token_key), []
+        ).append(subscription)
+    return shards
+
+
+async def _report_metrics(index: int, reports) -> None:
+    while True:
+        await asyncio.sleep(METRICS_REPORT_INTERVAL)
+        reports.put((index, metrics.REGISTRY.snapshot()))
+
+
+def _get_inbox(inbox):
+    try:
+        return inbox.get(timeout=INBOX_POLL_INTERVAL)
+    except queue.Empty:
+        return None
+
+
+async def _read_inbox(engine, inbox) -> None:
+    # Чтение с таймаутом освобождает поток пула не позже чем через
+    # INBOX_POLL_INTERVAL после остановки, иначе asyncio.run его ждёт.
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await loop.run_in_executor(None, _get_inbox, inbox)
+        if item is None:
+            continue
+        key, homeworks = item
+        for subscription in engine.find_subscriptions(key=key):
+            await engine.ingest(subscription, homeworks)
+
+
+async def _serve_worker(index: int, subscriptions: list, reports,
+                        inbox) -> None:
+    from engine import API_RATE, build_engine
+    from journal import NOTIFY_JOURNAL
+    from recording import RECORD_FILE
+
+    # Лимит запросов к API общий на бота и делится между процессами.
+    engine = build_engine(
+        subscriptions, serve_http=False,
+        journal_path=NOTIFY_JOURNAL and f'{NOTIFY_JOURNAL}-worker{index}',
+        api_rate=API_RATE / WORKERS,
+        record_path=RECORD_FILE and f'{RECORD_FILE}-worker{index}'
+    )
+    tasks: list = []
+    if metrics.ENABLED:
+        tasks.append(_report_metrics(index, reports))
+    if ingest.ENABLED:
+        tasks.append(_read_inbox(engine, inbox))
+    helpers = [asyncio.ensure_future(task) for task in tasks]
+    try:
+        # По SIGTERM движок отправляет очередь и завершает run().
+        await engine.run()
+    finally:
+        for helper in helpers:
+            helper.cancel()
+
+
+def run_worker(index: int, subscriptions: list, reports, inbox) -> None:
+    """Точка входа рабочего процесса."""
+    from logconfig import setup_logging
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    # До запуска движка SIGHUP от супервизора не должен убивать процесс.
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    listener = setup_logging(suffix=f'-worker{index}')
+    logger.info(
+        'Рабочий процесс %s обслуживает %s подписок', index, len(subscriptions)
+    )
+    try:
+        asyncio.run(_serve_worker(index, subscriptions, reports, inbox))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if listener:
+            listener.stop()
+
+
+class Supervisor:
+    """Запускает рабочие процессы и перезапускает упавшие.
+
+    Подписки закрепляются за процессами через HashRing. Состояние опроса
+    процессы сохраняют в общем хранилище, поэтому перезапущенный процесс
+    продолжает с сохранённых from_date и статусов и не повторяет
+    уже отправленные уведомления.
+
+    По SIGHUP супервизор перечитывает настройки и подписки: процессы,
+    у которых изменились подписки, перезапускаются, остальным
+    пересылается SIGHUP.
+    """
+
+    def __init__(self, subscriptions: list, workers: int = WORKERS) -> None:
+        self.subscriptions = subscriptions
+        self.ring = HashRing(range(workers))
+        self.shards = assign(subscriptions, self.ring)
+        self._context = multiprocessing.get_context('spawn')
+        self.reports = self._context.Queue()
+        self.inboxes = {index: self._context.Queue() for index in self.shards}
+        self.processes: dict = {}
+        self.restarts: dict = {index: 0 for index in self.shards}
+        self.pending: dict = {}
+        self.snapshots: dict = {}
+        self._stopping = False
+        self._reload = False
+
+    def _start(self, index: int) -> None:
+        process = self._context.Process(
+            target=run_worker,
+            args=(index, self.shards[index], self.reports,
+                  self.inboxes[index]),
+            name=f'worker-{index}'
+        )
+        process.start()
+        self.processes[index] = (process, time.monotonic())
+
+    def _find_subscriptions(self, key: str = None, chat_id=None) -> list:
+        return [
+            subscription for subscription in self.subscriptions
+            if subscription.key == key
+            or (key is None and str(subscription.chat_id) == str(chat_id))
+        ]
+
+    def _dispatch(self, subscription, homeworks: list) -> None:
+        index = self.ring.get(subscription.token_key)
+        self.inboxes[index].put((subscription.key, homeworks))
+
+    def _collect_reports(self, timeout: float) -> None:
+        try:
+            index, snapshot = self.reports.get(timeout=timeout)
+        except queue.Empty:
+            return
+        self.snapshots[index] = snapshot
+        while True:
+            try:
+                index, snapshot = self.reports.get_nowait()
+            except queue.Empty:
+                break
+            self.snapshots[index] = snapshot
+        metrics.REGISTRY.merge(list(self.snapshots.values()))
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for index, restart_at in list(self.pending.items()):
+            if restart_at <= now:
+                del self.pending[index]
+                self._start(index)
+        for index, (process, started) in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[index]
+            if now - started > MAX_RESTART_DELAY:
+                self.restarts[index] = 0
+            delay = min(
+                RESTART_DELAY * 2 ** self.restarts[index], MAX_RESTART_DELAY
+            )
+            self.restarts[index] += 1
+            self.pending[index] = now + delay
+            logger.error(
+                'Рабочий процесс %s завершился с кодом %s, '
+                'перезапуск через %s с', index, process.exitcode, delay
+            )
+
+    def health_report(self) -> dict:
+        """Состояние рабочих процессов для /health.
+
+        Зависший процесс завершает свой сторож, и супервизор его
+        перезапускает.
+        """
+        workers: dict = {}
+        for index in self.shards:
+            process, _ = self.processes.get(index, (None, None))
+            workers[str(index)] = {
+                'alive': process is not None,
+                'pid': process.pid if process else None,
+                'restarts': self.restarts[index],
+                'subscriptions': len(self.shards[index]),
+            }
+        return {'time': time.time(), 'workers': workers}
+
+    def request_reload(self, *args) -> None:
+        """Обработчик SIGHUP: перечитать подписки в главном цикле."""
+        self._reload = True
+
+    def _restart(self, index: int, subscriptions: list) -> None:
+        process, _ = self.processes.pop(index, (None, None))
+        if process is not None:
+            process.terminate()
+            join_process(process)
+        self.pending.pop(index, None)
+        if not subscriptions:
+            self.shards.pop(index, None)
+            return
+        self.shards[index] = subscriptions
+        self.inboxes.setdefault(index, self._context.Queue())
+        self.restarts.setdefault(index, 0)
+        self._start(index)
+
+    def reload(self) -> None:
+        """Перечитывает настройки и подписки без остановки процессов."""
+        from engine import load_subscriptions, reload_settings
+
+        try:
+            changed = reload_settings()
+            subscriptions = load_subscriptions()
+        except Exception as error:
+            logger.error('Не удалось перечитать настройки: %s', error)
+            return
+        shards = assign(subscriptions, self.ring)
+        self.subscriptions = subscriptions
+        restarted = 0
+        for index in set(self.shards) | set(shards):
+            old = [item.key for item in self.shards.get(index, [])]
+            new = [item.key for item in shards.get(index, [])]
+            if old != new:
+                restarted += 1
+                self._restart(index, shards.get(index, []))
+            elif index in self.processes:
+                os.kill(self.processes[index][0].pid, signal.SIGHUP)
+        logger.info(
+            'Настройки перечитаны, изменились: %s; перезапущено %s '
+            'процессов', ', '.join(changed) or '-', restarted
+        )
+
+    def stop(self, *args) -> None:
+        """Останавливает рабочие процессы."""
+        self._stopping = True
+        for process, _ in self.processes.values():
+            process.terminate()
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT
+        for process, _ in self.processes.values():
+            join_process(process, max(deadline - time.monotonic(), 0))
+
+    def run(self) -> None:
+        """Запускает процессы и следит за ними до остановки."""
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        signal.signal(signal.SIGHUP, self.request_reload)
+        for index in self.shards:
+            self._start(index)
+        logger.info(
+            'Запущено %s рабочих процессов для %s подписок',
+            len(self.processes), len(self.subscriptions)
+        )
+        if metrics.ENABLED:
+            metrics.start_server()
+        if health.ENABLED:
+            health.start_server(self.health_report)
+        if ingest.ENABLED:
+            ingest.start_server(self._find_subscriptions, self._dispatch)
+        try:
+            while not self._stopping:
+                self._collect_reports(timeout=1.0)
+                if self._reload:
+                    self._reload = False
+                    self.reload()
+                self._check_workers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
@@ -0,0 +1,99 @@
+import pytest
+
+
+class MockClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def api_error(status_code=None):
+    from exceptions import ConnectionError, WrongAPIResponseCodeError
+
+    cause = (
+        WrongAPIResponseCodeError('Error', status_code=status_code)
+        if status_code else OSError('Connection refused')
+    )
+    error = ConnectionError(f'Ошибка при запросе к API: {cause}')
+    error.__cause__ = cause
+    return error
+
+
+class TestCircuitBreaker:
+
+    def make_breaker(self, clock):
+        from breaker import CircuitBreaker
+
+        return CircuitBreaker(
+            'test', threshold=3, reset_timeout=30, clock=clock
+        )
+
+    def fail(self, breaker, error):
+        def request():
+            raise error
+
+        with pytest.raises(Exception):
+            breaker.call(request)
+
+    def test_opens_after_threshold(self):
+        from breaker import OPEN
+        from exceptions import CircuitOpenError, ConnectionError
+
+        breaker = self.make_breaker(MockClock())
+        for _ in range(3):
+            self.fail(breaker, api_error())
+        assert breaker.state == OPEN
+        calls = []
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.call(calls.append, 1)
+        assert calls == [], (
+            'Проверьте, что разомкнутый предохранитель не делает запрос'
+        )
+        assert isinstance(error.value, ConnectionError)
+        assert error.value.retry_after == 30
+
+    def test_client_errors_do_not_open(self):
+        from breaker import CLOSED
+
+        breaker = self.make_breaker(MockClock())
+        for _ in range(5):
+            self.fail(breaker, api_error(401))
+            self.fail(breaker, api_error(429))
+        assert breaker.state == CLOSED, (
+            'Проверьте, что ответы 4xx не размыкают предохранитель'
+        )
+        for _ in range(3):
+            self.fail(breaker, api_error(503))
+        assert breaker.state != CLOSED
+
+    def test_half_open_probe(self):
+        from breaker import CLOSED, HALF_OPEN, OPEN
+        from exceptions import CircuitOpenError
+
+        clock = MockClock()
+        breaker = self.make_breaker(clock)
+        for _ in range(3):
+            self.fail(breaker, api_error())
+        clock.now = 31
+        self.fail(breaker, api_error())
+        assert breaker.state == OPEN, (
+            'Проверьте, что неудачный пробный запрос снова размыкает '
+            'предохранитель'
+        )
+        clock.now = 62
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.on_success()
+        assert breaker.state == CLOSED
+        assert breaker.call(len, 'ok') == 2
+
+    def test_shared_by_endpoint(self):
+        from breaker import get_breaker
+
+        assert get_breaker('http://a') is get_breaker('http://a')
+        assert get_breaker('http://a') is not get_breaker('http://b')
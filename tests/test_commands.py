@@ -0,0 +1,136 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import utils
+
+
+def make_update(update_id, chat_id, text):
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(chat_id=chat_id, text=text)
+    )
+
+
+class TestCommands:
+
+    def make_engine(self, monkeypatch, statuses, bot=None):
+        import engine
+
+        requests = utils.mock_fetch(
+            monkeypatch,
+            lambda token, from_date: [
+                {'id': 1, 'homework_name': 'hw1', 'status': status}
+                for status in statuses[-1:]
+            ],
+            current_date=int(time.time())
+        )
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(
+            bot or utils.MockBot(), [subscription]
+        )
+        return polling, subscription, requests
+
+    def test_parse_command(self):
+        from commands import parse_command
+
+        assert parse_command('/status@homework_bot now') == '/status'
+        assert parse_command('привет') is None
+
+    def test_status_from_cache(self, monkeypatch):
+        import commands
+
+        statuses = ['reviewing']
+        polling, subscription, requests = self.make_engine(
+            monkeypatch, statuses
+        )
+        listener = commands.CommandListener(polling, max_age=300)
+
+        async def ask():
+            polling.start_polling(subscription)
+            await asyncio.sleep(0.05)
+            statuses.append('approved')
+            status = await listener.answer(1, '/status')
+            stranger = await listener.answer(2, '/status')
+            await polling.stop_polling()
+            return status, stranger
+
+        status, stranger = asyncio.run(ask())
+        assert [token for token, _ in requests] == ['token'], (
+            'Проверьте, что свежие данные не запрашиваются у API повторно'
+        )
+        assert 'hw1: Работа взята на проверку ревьюером.' in status
+        assert stranger == commands.NOT_SUBSCRIBED
+
+    def test_stale_cache_refreshed(self, monkeypatch):
+        import commands
+
+        statuses = ['reviewing']
+        polling, subscription, requests = self.make_engine(
+            monkeypatch, statuses
+        )
+        listener = commands.CommandListener(polling, max_age=300)
+
+        async def ask():
+            polling.start_polling(subscription)
+            await asyncio.sleep(0.05)
+            state = polling.states[subscription.key]
+            state.polled_at -= 600
+            statuses.append('approved')
+            status = await listener.answer(1, '/status')
+            history = await listener.answer(1, '/history')
+            await polling.stop_polling()
+            return status, history
+
+        status, history = asyncio.run(ask())
+        assert len(requests) == 2, (
+            'Проверьте, что устаревшие данные опрашиваются вне очереди'
+        )
+        assert 'hw1: Работа проверена: ревьюеру всё понравилось.' in status
+        assert history.index('взята на проверку') < history.index('Ура'), (
+            'Проверьте, что /history показывает смены статусов по порядку'
+        )
+
+    def test_listener_replies(self, monkeypatch):
+        import commands
+
+        bot = utils.MockBot(updates=[
+            make_update(7, 1, '/help'), make_update(8, 5, 'привет')
+        ])
+        polling, _, _ = self.make_engine(monkeypatch, [], bot)
+        listener = commands.CommandListener(polling)
+
+        async def listen():
+            sender = asyncio.ensure_future(polling.outbox.run())
+            await listener.poll_updates()
+            await polling.outbox.join()
+            sender.cancel()
+
+        asyncio.run(listen())
+        assert bot.messages == [(1, commands.HELP)], (
+            'Проверьте, что бот отвечает только на команды'
+        )
+        assert listener.offset == 9, (
+            'Проверьте, что полученные обновления подтверждаются'
+        )
+
+    def test_status_names_beyond_history(self):
+        import commands
+        import engine
+
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(utils.MockBot(), [subscription])
+        state = polling.new_state(subscription, 0)
+        homeworks = [
+            {'id': 100 + index, 'homework_name': f'hw{index}',
+             'status': 'approved'}
+            for index in range(engine.HISTORY_SIZE + 5)
+        ]
+        asyncio.run(
+            polling.process_homeworks(subscription, state, homeworks)
+        )
+        status = commands.render_status([state])
+        assert 'hw0: Работа проверена' in status and '100:' not in status, (
+            'Проверьте, что /status показывает названия работ, '
+            'вышедших из истории смен статусов'
+        )
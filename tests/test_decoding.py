@@ -0,0 +1,72 @@
+import json
+
+import pytest
+import utils
+
+RESPONSE = {
+    'homeworks': [{
+        'id': 123,
+        'status': 'approved',
+        'homework_name': 'hw123',
+        'reviewer_comment': 'Всё нравится',
+        'date_updated': '2020-02-13T14:40:57Z',
+        'lesson_name': 'Итоговый проект'
+    }],
+    'current_date': 1581604970
+}
+
+
+class TestDecoding:
+
+    @pytest.mark.parametrize('backend', ['json', 'auto'])
+    def test_lean(self, monkeypatch, backend):
+        import decoding
+
+        monkeypatch.setattr(decoding, 'JSON_BACKEND', backend)
+        data = decoding.loads(json.dumps(RESPONSE).encode(), lean=True)
+        assert data == {
+            'homeworks': [{
+                'id': 123,
+                'status': 'approved',
+                'homework_name': 'hw123',
+                'date_updated': '2020-02-13T14:40:57Z'
+            }],
+            'current_date': 1581604970
+        }, (
+            'Проверьте, что в экономном режиме остаются только поля, '
+            'нужные для разбора статусов'
+        )
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        import decoding
+
+        monkeypatch.setattr(decoding, 'orjson', None)
+        assert decoding.backend() == 'json'
+        body = json.dumps(RESPONSE).encode()
+        assert decoding.loads(body, lean=False) == RESPONSE
+
+    def test_invalid_body(self):
+        import decoding
+        from exceptions import ConnectionError
+
+        with pytest.raises(ConnectionError):
+            decoding.decode_api_body(b'<html>')
+
+    def test_get_api_answer_path(self):
+        import homework
+        from exceptions import ConnectionError
+
+        def json_called():
+            raise AssertionError(
+                'Проверьте, что ответ get_api_answer разбирается тем же '
+                'декодером, что и в кэше ответов'
+            )
+
+        response = utils.MockAPIResponse(RESPONSE)
+        response.json = json_called
+        assert homework.decode_api_response(response)['current_date'] == (
+            RESPONSE['current_date']
+        )
+        response.content = b'<html>'
+        with pytest.raises(ConnectionError):
+            homework.decode_api_response(response)
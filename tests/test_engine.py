@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import utils
+
+
+class TestEngine:
+
+    def test_load_subscriptions(self, tmp_path):
+        import engine
+
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps([
+            {'practicum_token': 'token1', 'chat_id': 1},
+            {'practicum_token': 'token2', 'chat_id': 2},
+        ]))
+        subscriptions = engine.load_subscriptions(str(path))
+        assert [s.chat_id for s in subscriptions] == [1, 2], (
+            'Проверьте, что подписки загружаются из файла'
+        )
+        assert 'token1' not in subscriptions[0].key, (
+            'Ключ подписки не должен содержать токен Практикума'
+        )
+
+    def test_poll_once_separate_states(self, monkeypatch, random_timestamp):
+        import engine
+
+        utils.mock_fetch(
+            monkeypatch,
+            lambda token, from_date: [
+                {'homework_name': token, 'status': 'approved'}
+            ],
+            current_date=random_timestamp
+        )
+        bot = utils.MockBot()
+        subscriptions = [
+            engine.Subscription('token1', 1),
+            engine.Subscription('token2', 2),
+        ]
+        polling = engine.PollingEngine(bot, subscriptions)
+
+        async def poll_twice():
+            sender = asyncio.ensure_future(polling.outbox.run())
+            for _ in range(2):
+                for subscription in subscriptions:
+                    state = polling.states.setdefault(
+                        subscription.key, engine.SubscriptionState(0)
+                    )
+                    await polling.poll_once(subscription, state)
+            await polling.outbox.join()
+            sender.cancel()
+
+        asyncio.run(poll_twice())
+        assert [chat_id for chat_id, _ in bot.messages] == [1, 2], (
+            'Проверьте, что каждая подписка получает сообщение '
+            'об изменении статуса ровно один раз'
+        )
+
+    def test_repeated_errors_sent_as_digest(self, monkeypatch):
+        import engine
+
+        errors = [TimeoutError('timeout'), ValueError('Error 500!')] * 3
+
+        def fail(token, from_date):
+            raise errors.pop(0)
+
+        utils.mock_fetch(monkeypatch, fail)
+        bot = utils.MockBot()
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(bot, [subscription])
+
+        async def poll():
+            sender = asyncio.ensure_future(polling.outbox.run())
+            state = polling.states.setdefault(
+                subscription.key, engine.SubscriptionState(0)
+            )
+            while errors:
+                await polling.poll_once(subscription, state)
+            polling.send_digests()
+            await polling.outbox.join()
+            sender.cancel()
+
+        asyncio.run(poll())
+        assert len(bot.messages) == 3, (
+            'Проверьте, что повторы ошибок не отправляются в чат, '
+            'а попадают в сводку'
+        )
+        assert bot.messages[-1][1].startswith(
+            'Повторяющиеся ошибки, не отправленные в чат: 4'
+        )
+
+    def test_message_rendered_on_send(self):
+        import engine
+        import homework
+
+        bot = utils.MockBot()
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(bot, [subscription])
+        changed = {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+
+        async def notify():
+            state = polling.new_state(subscription, 0)
+            await polling.process_homeworks(subscription, state, [changed])
+            queued = polling.outbox.queue._queue[0].text
+            sender = asyncio.ensure_future(polling.outbox.run())
+            await polling.outbox.join()
+            sender.cancel()
+            return queued
+
+        queued = asyncio.run(notify())
+        assert isinstance(queued, homework.StatusMessage), (
+            'Проверьте, что в очереди хранится статус, а не готовый текст'
+        )
+        assert bot.messages == [(1, homework.parse_status(changed))]
+
+    def test_invalid_entry_keeps_status(self):
+        import engine
+
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(utils.MockBot(), [subscription])
+        approved = {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+
+        async def process():
+            state = polling.new_state(subscription, 0)
+            for homework in (approved, {'id': 1, 'homework_name': 'hw1'},
+                             approved):
+                await polling.process_homeworks(
+                    subscription, state, [homework]
+                )
+            return state
+
+        state = asyncio.run(process())
+        notifications = [
+            message.text for message in polling.outbox.queue._queue
+            if not isinstance(message.text, str)
+        ]
+        assert len(notifications) == 1, (
+            'Проверьте, что запись без статуса не затирает последний '
+            'известный статус и не приводит к повторному уведомлению'
+        )
+        assert state.tracker.statuses == {1: 'approved'}
@@ -0,0 +1,73 @@
+class MockClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestErrorCache:
+
+    def test_alternating_errors_reported_once(self):
+        from errorcache import ErrorCache
+
+        cache = ErrorCache(clock=MockClock())
+        timeout = TimeoutError('Время ожидания истекло')
+        server = ValueError('Error 500!')
+        reported = [cache.report(error) for error in (timeout, server) * 3]
+        assert reported == [True, True, False, False, False, False], (
+            'Проверьте, что чередующиеся ошибки отправляются по одному разу'
+        )
+
+    def test_error_reported_again_after_ttl(self):
+        from errorcache import ErrorCache
+
+        clock = MockClock()
+        cache = ErrorCache(ttl=60, clock=clock)
+        assert cache.report(TimeoutError('timeout'))
+        clock.now = 59
+        assert not cache.report(TimeoutError('timeout'))
+        clock.now = 120
+        assert cache.report(TimeoutError('timeout')), (
+            'Проверьте, что ошибка отправляется снова после истечения TTL'
+        )
+
+    def test_volatile_parts_ignored(self):
+        from errorcache import ErrorCache
+
+        cache = ErrorCache(clock=MockClock())
+        assert cache.report(OSError('object at 0x7f3a12 from 1644763257'))
+        assert not cache.report(OSError('object at 0x7f9b00 from 1644763857'))
+        assert cache.report(ValueError('object at 0x7f9b00 from 1644763857'))
+
+    def test_lru_eviction(self):
+        from errorcache import ErrorCache
+
+        cache = ErrorCache(size=2, clock=MockClock())
+        cache.report(ValueError('a'))
+        cache.report(ValueError('b'))
+        cache.report(ValueError('a'))
+        cache.report(ValueError('c'))
+        assert len(cache) == 2
+        assert not cache.report(ValueError('a'))
+        assert cache.report(ValueError('b')), (
+            'Проверьте, что вытесняется давно не встречавшаяся ошибка'
+        )
+
+    def test_digest(self):
+        from errorcache import ErrorCache
+
+        cache = ErrorCache(clock=MockClock())
+        assert cache.digest() is None
+        for _ in range(4):
+            cache.report(TimeoutError('timeout'))
+        cache.report(ValueError('Error 500!'))
+        digest = cache.digest()
+        assert digest.splitlines() == [
+            'Повторяющиеся ошибки, не отправленные в чат: 3',
+            'TimeoutError: timeout — 3 раз',
+        ]
+        assert cache.digest() is None, (
+            'Проверьте, что сводка обнуляет счётчики подавленных ошибок'
+        )
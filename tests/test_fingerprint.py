@@ -0,0 +1,68 @@
+import json
+
+import utils
+
+
+class TestResponseCache:
+
+    def test_unchanged_payload_skips_parsing(self, monkeypatch):
+        import fingerprint
+        import homework
+
+        responses = [
+            utils.MockAPIResponse({'homeworks': [], 'current_date': 100}),
+            utils.MockAPIResponse({'homeworks': [], 'current_date': 200}),
+        ]
+        decoded = []
+
+        def mock_decode(body):
+            decoded.append(body)
+            return json.loads(body)
+
+        monkeypatch.setattr(
+            homework, 'fetch_api_response',
+            lambda token, from_date, headers=None: responses.pop(0)
+        )
+        monkeypatch.setattr(fingerprint, 'decode_api_body', mock_decode)
+        monkeypatch.setattr(
+            fingerprint, 'STATS', {'hits': 0, 'misses': 0, 'not_modified': 0}
+        )
+        cache = fingerprint.ResponseCache()
+
+        assert cache.fetch('token', 1) == {'homeworks': [], 'current_date': 100}
+        cache.commit()
+        assert cache.fetch('token', 100) is None, (
+            'Проверьте, что ответ, отличающийся только `current_date`, '
+            'не разбирается повторно'
+        )
+        assert cache.current_date == 200, (
+            'Проверьте, что `current_date` извлекается без разбора JSON'
+        )
+        assert len(decoded) == 1
+        assert fingerprint.hit_rate() == 0.5
+
+    def test_conditional_request(self, monkeypatch):
+        import fingerprint
+        import homework
+
+        sent_headers = []
+        responses = [
+            utils.MockAPIResponse(
+                {'homeworks': [], 'current_date': 100},
+                headers={'ETag': '"v1"'}
+            ),
+            utils.MockAPIResponse({}, status_code=304),
+        ]
+
+        def mock_fetch(token, from_date, headers=None):
+            sent_headers.append(headers)
+            return responses.pop(0)
+
+        monkeypatch.setattr(homework, 'fetch_api_response', mock_fetch)
+        cache = fingerprint.ResponseCache()
+        cache.fetch('token', 1)
+        cache.commit()
+        assert cache.fetch('token', 100) is None
+        assert sent_headers[1] == {'If-None-Match': '"v1"'}, (
+            'Проверьте, что ETag передаётся в заголовке If-None-Match'
+        )
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+
+import utils
+
+
+class TestHealth:
+
+    def test_watchdog_dumps_once(self, monkeypatch, caplog):
+        import health
+
+        reasons = ['цикл событий не отвечает 90 с', None]
+        watchdog = health.Watchdog(lambda: reasons[0], action='dump')
+        watchdog.inspect()
+        watchdog.inspect()
+        dumps = [
+            record for record in caplog.records
+            if record.levelname == 'CRITICAL'
+        ]
+        assert len(dumps) == 1, (
+            'Проверьте, что стеки потоков пишутся один раз за зависание'
+        )
+        assert 'Поток' in dumps[0].getMessage()
+        assert watchdog.stalled == reasons[0]
+        reasons.pop(0)
+        watchdog.inspect()
+        assert watchdog.stalled is None
+
+    def test_watchdog_exits(self, monkeypatch):
+        import health
+
+        exits = []
+        monkeypatch.setattr(health.os, '_exit', exits.append)
+        health.Watchdog(lambda: 'завис', action='exit').inspect()
+        assert exits == [health.WATCHDOG_EXIT_CODE], (
+            'Проверьте, что при зависании процесс завершается для перезапуска'
+        )
+
+    def test_engine_stall_and_report(self, monkeypatch, random_timestamp):
+        import engine
+        import health
+
+        utils.mock_fetch(monkeypatch, current_date=random_timestamp)
+        subscription = engine.Subscription('token', 1)
+        polling = engine.PollingEngine(None, [subscription])
+        state = polling.new_state(subscription, 0)
+        asyncio.run(polling.poll_once(subscription, state))
+        assert polling.stall_reason() is None
+
+        view = health.make_view(polling.health_report, polling.watchdog)
+        status, _, body = view({}, b'', {})
+        report = json.loads(body)
+        assert status == 200 and report['status'] == 'ok'
+        assert report['subscriptions'][subscription.key]['last_poll'], (
+            'Проверьте, что /health показывает время последнего опроса'
+        )
+
+        polling._inflight['hung'] = (
+            time.monotonic() - health.WATCHDOG_POLL_TIMEOUT - 1
+        )
+        assert 'запрос к API' in polling.stall_reason()
+        polling._inflight.clear()
+        polling.beat -= health.WATCHDOG_LOOP_TIMEOUT + 1
+        assert 'цикл событий' in polling.stall_reason()
+        polling.watchdog.stalled = polling.stall_reason()
+        status, _, body = view({}, b'', {})
+        assert status == 503 and json.loads(body)['status'] == 'stalled'
+
+    def test_pool_queue_not_inflight(self, monkeypatch):
+        import engine
+
+        utils.mock_fetch(monkeypatch, delay=0.2)
+        subscriptions = [
+            engine.Subscription(f'token{index}', index) for index in range(2)
+        ]
+        polling = engine.PollingEngine(None, subscriptions, max_workers=1)
+
+        async def poll():
+            polls = asyncio.gather(*(
+                polling.poll_once(subscription, polling.new_state(
+                    subscription, 0
+                ))
+                for subscription in subscriptions
+            ))
+            await asyncio.sleep(0.1)
+            inflight = len(polling._inflight)
+            await polls
+            return inflight
+
+        assert asyncio.run(poll()) == 1, (
+            'Проверьте, что ожидание свободного потока не считается '
+            'выполняющимся запросом к API'
+        )
+        assert polling._inflight == {}
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+
+class TestIngest:
+
+    def call_view(self, body, query, headers=None):
+        import engine
+        import ingest
+
+        polling = engine.PollingEngine(None, [engine.Subscription('t', 42)])
+
+        async def post():
+            loop = asyncio.get_running_loop()
+            view = ingest.make_view(
+                polling.find_subscriptions,
+                ingest.engine_dispatcher(polling, loop),
+                token='secret'
+            )
+            result = await loop.run_in_executor(
+                None, view, query, body,
+                headers if headers is not None
+                else {'X-Ingest-Token': 'secret'}
+            )
+            await asyncio.sleep(0.05)
+            return result, polling.outbox.depth
+
+        return asyncio.run(post())
+
+    def test_event_is_sent(self):
+        event = {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+        (status, _, body), depth = self.call_view(
+            json.dumps(event).encode(), {'chat_id': ['42']}
+        )
+        assert status == HTTPStatus.ACCEPTED
+        assert json.loads(body) == {'accepted': 1}
+        assert depth == 1, (
+            'Проверьте, что событие сразу ставит уведомление в очередь'
+        )
+
+    def test_rejects_bad_requests(self):
+        event = json.dumps(
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+        )
+        (status, _, _), _ = self.call_view(
+            event.encode(), {'chat_id': ['42']}, headers={}
+        )
+        assert status == HTTPStatus.UNAUTHORIZED
+        (status, _, _), _ = self.call_view(event.encode(), {'chat_id': ['1']})
+        assert status == HTTPStatus.NOT_FOUND
+        (status, _, _), _ = self.call_view(b'[1]', {'chat_id': ['42']})
+        assert status == HTTPStatus.BAD_REQUEST
+        no_id = json.dumps({'homework_name': 'hw1', 'status': 'approved'})
+        (status, _, body), depth = self.call_view(
+            no_id.encode(), {'chat_id': ['42']}
+        )
+        assert status == HTTPStatus.BAD_REQUEST and depth == 0, (
+            'Проверьте, что событие без id отклоняется'
+        )
+        assert 'id' in json.loads(body)['error']
+
+    def test_stale_event_is_skipped(self):
+        import engine
+
+        subscription = engine.Subscription('t', 42)
+        polling = engine.PollingEngine(None, [subscription])
+
+        async def ingest():
+            await polling.ingest(subscription, [{
+                'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+                'date_updated': '2022-02-13T14:40:57Z'
+            }])
+            await polling.ingest(subscription, [{
+                'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+                'date_updated': '2022-02-12T10:00:00Z'
+            }])
+            return polling.outbox.depth
+
+        assert asyncio.run(ingest()) == 1, (
+            'Проверьте, что устаревшее событие не меняет статус'
+        )
+        tracker = polling.states[subscription.key].tracker
+        assert tracker.statuses[1] == 'approved'
@@ -0,0 +1,124 @@
+import asyncio
+
+import utils
+
+
+class TestNotificationJournal:
+
+    def test_replay_unacknowledged(self, tmp_path):
+        from journal import NotificationJournal
+
+        path = str(tmp_path / 'notifications.journal')
+        journal = NotificationJournal(path)
+        journal.load()
+        first = journal.record(('sub', 1, 'approved'), 1, 'first')
+        assert journal.record(('sub', 1, 'approved'), 1, 'again') is None, (
+            'Проверьте, что уведомление с тем же ключом не записывается, '
+            'пока прошлое не доставлено'
+        )
+        second = journal.record(('sub', 2, 'rejected'), 1, 'second')
+        journal.ack(first.seq)
+        journal.flush()
+        with open(path, 'ab') as file:
+            file.write(b'{"s": 3, "k": ["sub"')
+
+        restored = NotificationJournal(path)
+        entries = restored.load()
+        assert [entry.key for entry in entries] == [
+            ('sub', 1, 'approved'), ('sub', 2, 'rejected')
+        ]
+        assert list(restored.pending) == [second.seq], (
+            'Проверьте, что после перезапуска повторяются только '
+            'неподтверждённые уведомления'
+        )
+        assert restored.record(('sub', 3, 'approved'), 1, 'third').seq == 3
+
+    def test_compact(self, tmp_path):
+        from journal import NotificationJournal
+
+        path = str(tmp_path / 'notifications.journal')
+        journal = NotificationJournal(path)
+        journal.load()
+        for homework_id in range(4):
+            journal.record(('sub', homework_id, 'approved'), 1, 'text')
+        journal.ack(1)
+        journal.ack(3)
+        journal.flush()
+        journal.compact(upto=2)
+        journal.ack(2)
+        journal.close()
+
+        restored = NotificationJournal(path)
+        assert [entry.seq for entry in restored.load()] == [2, 3, 4]
+        assert list(restored.pending) == [4]
+
+    def test_status_message_rebuilt(self, tmp_path):
+        from homework import StatusMessage
+        from journal import NotificationJournal
+
+        path = str(tmp_path / 'notifications.journal')
+        journal = NotificationJournal(path)
+        journal.load()
+        message = StatusMessage({'homework_name': 'hw1', 'status': 'approved'})
+        journal.record(('sub', 1, 'approved'), 1, message)
+        journal.close()
+        with open(path, encoding='utf-8') as file:
+            assert str(message) not in file.read(), (
+                'Проверьте, что журнал хранит статус, а не готовый текст'
+            )
+
+        entry, = NotificationJournal(path).load()
+        assert isinstance(entry.text, StatusMessage)
+        assert str(entry.text) == str(message)
+
+
+class TestEngineJournal:
+
+    def test_crash_before_send_delivers_once(self, tmp_path, monkeypatch):
+        import engine
+        from journal import NotificationJournal
+        from storage import StateStore
+
+        utils.mock_fetch(
+            monkeypatch,
+            [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]
+        )
+        bot = utils.MockBot()
+        subscription = engine.Subscription('token', 1)
+
+        def make_engine():
+            return engine.PollingEngine(
+                bot, [subscription],
+                StateStore(str(tmp_path / 'state.sqlite3')),
+                journal=NotificationJournal(
+                    str(tmp_path / 'notifications.journal')
+                )
+            )
+
+        async def crash_before_send():
+            polling = make_engine()
+            await polling.restore()
+            state = polling.states[subscription.key]
+            await polling.poll_once(subscription, state)
+            await polling.flush_journal()
+
+        async def restart():
+            polling = make_engine()
+            await polling.restore()
+            sender = asyncio.ensure_future(polling.outbox.run())
+            state = polling.states[subscription.key]
+            await polling.poll_once(subscription, state)
+            await polling.flush_journal()
+            await polling.outbox.join()
+            sender.cancel()
+            # Падение после доставки, но до сохранения состояния.
+            await polling.flush_journal()
+
+        asyncio.run(crash_before_send())
+        assert bot.messages == []
+        asyncio.run(restart())
+        asyncio.run(restart())
+        assert len(bot.messages) == 1, (
+            'Проверьте, что уведомление из журнала доставляется после '
+            'перезапуска ровно один раз'
+        )
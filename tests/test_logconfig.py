@@ -0,0 +1,56 @@
+import json
+import logging
+
+
+class TestLogging:
+
+    def make_record(self, msg, *args, level=logging.INFO):
+        return logging.LogRecord(
+            'homework', level, __file__, 1, msg, args, None
+        )
+
+    def test_sampling(self):
+        from logconfig import SamplingFilter
+
+        sampler = SamplingFilter(3)
+        passed = [
+            sampler.filter(self.make_record('Опрос чата %s', chat_id))
+            for chat_id in range(6)
+        ]
+        assert passed == [True, False, False, True, False, False], (
+            'Проверьте, что проходит одна из N записей с одним шаблоном'
+        )
+        assert sampler.filter(
+            self.make_record('Ошибка', level=logging.ERROR)
+        ), 'Проверьте, что ошибки не отбрасываются'
+
+    def test_json_formatter(self):
+        from logconfig import JsonFormatter
+
+        line = JsonFormatter().format(self.make_record('Чат %s', 42))
+        data = json.loads(line)
+        assert data['message'] == 'Чат 42'
+        assert data['level'] == 'INFO'
+
+    def test_queue_mode(self, tmp_path):
+        from logconfig import setup_logging
+
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        listener = setup_logging(
+            mode='queue', level='INFO', log_format='text',
+            sample_rate=1, log_dir=str(tmp_path)
+        )
+        try:
+            logging.getLogger('homework').info('Запрос к %s', 'API')
+        finally:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            for handler in root.handlers[:]:
+                if handler not in handlers:
+                    root.removeHandler(handler)
+            root.setLevel(level)
+        assert 'Запрос к API' in (tmp_path / 'main.log').read_text(
+            encoding='UTF-8'
+        ), 'Проверьте, что записи из очереди попадают в main.log'
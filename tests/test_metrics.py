@@ -0,0 +1,51 @@
+class TestMetrics:
+
+    def test_render_prometheus(self):
+        import metrics
+
+        registry = metrics.Registry()
+        counter = registry.register(
+            metrics.Counter('requests_total', 'Requests.', ('stage',))
+        )
+        histogram = registry.register(
+            metrics.Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1))
+        )
+        counter.inc('fetch')
+        counter.inc('fetch')
+        histogram.observe(0.05)
+        histogram.observe(5)
+        text = registry.render()
+        for line in (
+            '# TYPE requests_total counter',
+            'requests_total{stage="fetch"} 2',
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 1',
+            'latency_seconds_bucket{le="+Inf"} 2',
+            'latency_seconds_count 2',
+        ):
+            assert line in text.splitlines(), (
+                f'Проверьте формат Prometheus: нет строки `{line}`'
+            )
+
+    def test_disabled_timer(self, monkeypatch):
+        import metrics
+
+        monkeypatch.setattr(metrics, 'ENABLED', False)
+        assert metrics.timer('fetch') is metrics.NULL_TIMER, (
+            'Проверьте, что при отключённых метриках таймер не создаётся'
+        )
+
+    def test_stage_errors(self, monkeypatch):
+        import metrics
+        from exceptions import ConnectionError
+
+        monkeypatch.setattr(metrics, 'ENABLED', True)
+        try:
+            with metrics.timer('test_stage'):
+                raise ConnectionError('timeout')
+        except ConnectionError:
+            pass
+        assert metrics.ERRORS_TOTAL.values[
+            ('test_stage', 'ConnectionError')
+        ] == 1
+        assert metrics.STAGE_TOTAL.values[('test_stage',)] == 1
@@ -0,0 +1,93 @@
+import asyncio
+
+import utils
+from telegram.error import BadRequest, RetryAfter
+
+
+class TestOutboundQueue:
+
+    def deliver(self, bot, messages, on_done=None):
+        from outbox import OutboundQueue
+
+        outbox = OutboundQueue(bot, on_done=on_done)
+
+        async def send():
+            sender = asyncio.ensure_future(outbox.run())
+            for chat_id, text in messages:
+                outbox.put(chat_id, text)
+            await outbox.join()
+            sender.cancel()
+
+        asyncio.run(send())
+        return outbox
+
+    def test_retry_after(self):
+        bot = utils.MockBot([RetryAfter(0)])
+        outbox = self.deliver(bot, [(1, 'hello')])
+        assert bot.messages == [(1, 'hello')], (
+            'Проверьте, что сообщение повторяется после RetryAfter'
+        )
+        assert outbox.stats()['retried'] == 1
+
+    def test_fatal_error(self):
+        bot = utils.MockBot([BadRequest('chat not found')])
+        outbox = self.deliver(bot, [(1, 'hello'), (2, 'world')])
+        assert bot.messages == [(2, 'world')], (
+            'Проверьте, что ошибка одного чата не останавливает очередь'
+        )
+        stats = outbox.stats()
+        assert (stats['sent'], stats['failed'], stats['depth']) == (1, 1, 0)
+
+    def test_dropped_message_is_done(self):
+        done = []
+        bot = utils.MockBot([ValueError('unexpected')])
+        self.deliver(
+            bot, [(1, 'hello')],
+            on_done=lambda message: done.append(message.chat_id)
+        )
+        assert done == [1], (
+            'Проверьте, что отброшенное сообщение не остаётся в журнале'
+        )
+
+    def test_token_bucket(self):
+        from ratelimit import TokenBucket
+
+        now = [0.0]
+        bucket = TokenBucket(rate=1, capacity=2, clock=lambda: now[0])
+        delays = [bucket.reserve() for _ in range(4)]
+        assert delays == [0.0, 0.0, 1.0, 2.0], (
+            'Проверьте, что сверх ёмкости токены выдаются с задержкой'
+        )
+        now[0] = 10.0
+        assert bucket.reserve() == 0.0
+
+    def test_busy_chat_does_not_block_others(self):
+        import time
+
+        from outbox import OutboundQueue
+
+        bot = utils.MockBot()
+        outbox = OutboundQueue(bot)
+        delivered = {}
+
+        def send_message(chat_id=None, text=None, **kwargs):
+            delivered.setdefault(chat_id, time.monotonic())
+
+        bot.send_message = send_message
+
+        async def send():
+            sender = asyncio.ensure_future(outbox.run())
+            started = time.monotonic()
+            for text in range(5):
+                outbox.put(1, str(text))
+            outbox.put(2, 'hello')
+            while 2 not in delivered and time.monotonic() - started < 2:
+                await asyncio.sleep(0.01)
+            sender.cancel()
+            return started
+
+        started = asyncio.run(send())
+        assert delivered[2] - started < 0.5, (
+            'Проверьте, что ожидание лимита одного чата не задерживает '
+            'сообщения в другие чаты'
+        )
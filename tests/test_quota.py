@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+import utils
+
+
+class TestQuota:
+
+    def poll_all(self, monkeypatch, tokens, api_rate, api_burst):
+        import engine
+
+        utils.mock_fetch(monkeypatch)
+        subscriptions = [
+            engine.Subscription(token, index)
+            for index, token in enumerate(tokens)
+        ]
+        polling = engine.PollingEngine(
+            None, subscriptions, api_rate=api_rate, api_burst=api_burst
+        )
+
+        async def poll():
+            await asyncio.gather(*(
+                polling.poll_once(subscription, polling.new_state(
+                    subscription, 0
+                ))
+                for subscription in subscriptions
+            ))
+
+        asyncio.run(poll())
+        return polling, [
+            polling.states[subscription.key].quota_delay
+            for subscription in subscriptions
+        ]
+
+    def test_burst_spread(self, monkeypatch):
+        _, delays = self.poll_all(
+            monkeypatch, [f'token{index}' for index in range(6)], 10, 2
+        )
+        assert sorted(delays) == pytest.approx(
+            [0, 0, 0.1, 0.2, 0.3, 0.4], abs=0.02
+        ), (
+            'Проверьте, что запросы сверх запаса равномерно растягиваются '
+            'с заданной частотой'
+        )
+
+    def test_shared_token_spends_one_slot(self, monkeypatch):
+        polling, delays = self.poll_all(
+            monkeypatch, ['token', 'token', 'token', 'other'], 10, 1
+        )
+        assert delays[:3] == [0, 0, 0], (
+            'Проверьте, что подписки одного токена ждут лимит вместе'
+        )
+        assert delays[3] == pytest.approx(0.1, abs=0.02)
+
+    def test_disabled(self, monkeypatch):
+        polling, delays = self.poll_all(
+            monkeypatch, [f'token{index}' for index in range(5)], 0, 1
+        )
+        assert polling.api_bucket is None and delays == [0] * 5
@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+
+import utils
+
+
+class TestReplay:
+
+    def record(self, monkeypatch, path):
+        import engine
+        import outbox
+        import recording
+        from exceptions import ConnectionError, WrongAPIResponseCodeError
+
+        statuses = ['reviewing', 'reviewing', 'approved', None]
+        rounds = [0]
+
+        def homeworks(token, from_date):
+            status = statuses[rounds[0]]
+            if status is None:
+                raise ConnectionError('Эндпоинт недоступен') from (
+                    WrongAPIResponseCodeError('Error 503!', status_code=503)
+                )
+            return [{'id': 1, 'homework_name': 'hw1', 'status': status}]
+
+        utils.mock_fetch(monkeypatch, homeworks)
+        monkeypatch.setattr(outbox, 'TELEGRAM_CHAT_RATE', 1000)
+        bot = utils.MockBot()
+        recording_bot, recorder = recording.start_recording(path, bot)
+        subscriptions = [
+            engine.Subscription('secret-token', 1),
+            engine.Subscription('secret-token', 2),
+        ]
+        polling = engine.PollingEngine(
+            recording_bot, subscriptions, recorder=recorder
+        )
+
+        async def poll():
+            for subscription in subscriptions:
+                polling.new_state(subscription, 0)
+            recorder.subscriptions(subscriptions, polling.states)
+            sender = asyncio.ensure_future(polling.outbox.run())
+            for index in range(len(statuses)):
+                rounds[0] = index
+                await asyncio.gather(*(
+                    polling.poll_once(
+                        subscription, polling.states[subscription.key]
+                    )
+                    for subscription in subscriptions
+                ))
+            await polling.outbox.join()
+            sender.cancel()
+
+        asyncio.run(poll())
+        recorder.close()
+        return bot.messages
+
+    def test_replay_matches_recording(self, monkeypatch, tmp_path):
+        import homework
+        import recording
+
+        path = str(tmp_path / 'traffic.rec.gz')
+        sent = self.record(monkeypatch, path)
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            assert 'secret-token' not in file.read(), (
+                'Проверьте, что токен Практикума не попадает в запись'
+            )
+        fetch = homework.fetch_api_response
+        report = asyncio.run(
+            recording.Replayer(recording.load_recording(path)).run()
+        )
+        assert homework.fetch_api_response is fetch
+        assert len(sent) == 6 and report['replayed'] == 6, (
+            'Проверьте, что проигрывание даёт те же уведомления и ошибки'
+        )
+        assert report['missing'] == report['extra'] == 0
+        assert report['from_date_mismatches'] == 0
+
+    def test_outage_does_not_trip_breaker(self):
+        import breaker
+        import homework
+        import recording
+
+        records = [{
+            'subs': [['token', 1, 0, []]], 'at': 0.0
+        }]
+        for index in range(8):
+            records.append({
+                'api': 'token', 'from': 0, 'status': 503, 'at': index + 1.0,
+                'error': 'Эндпоинт недоступен'
+            })
+        records.append({
+            'api': 'token', 'from': 0, 'status': 200, 'at': 10.0,
+            'body': '{"homeworks": [{"id": 1, "homework_name": "hw1", '
+                    '"status": "approved"}], "current_date": 10}'
+        })
+        shared = breaker.get_breaker(homework.ENDPOINT)
+        before = (shared.state, shared.failures)
+        replayer = recording.Replayer(records)
+        report = asyncio.run(replayer.run())
+        assert report['polls'] == 9
+        assert not any(
+            'приостановлены' in text for _, text in replayer.sent
+        ), 'Проверьте, что проигрывание не размыкает предохранитель'
+        assert replayer.sent[-1][1].startswith('Изменился статус'), (
+            'Проверьте, что ответ после сбоя проигрывается'
+        )
+        assert (shared.state, shared.failures) == before, (
+            'Проверьте, что проигрывание не трогает предохранитель процесса'
+        )
+
+    def test_truncated_recording(self, monkeypatch, tmp_path):
+        import recording
+
+        path = tmp_path / 'traffic.rec.gz'
+        self.record(monkeypatch, str(path))
+        data = path.read_bytes()
+        path.write_bytes(data[:len(data) - 20])
+        records = recording.load_recording(str(path))
+        assert all('at' in record for record in records), (
+            'Проверьте, что обрезанная запись читается до места обрыва'
+        )
@@ -0,0 +1,100 @@
+class TestPollScheduler:
+
+    def make_scheduler(self):
+        from scheduler import PollScheduler
+
+        return PollScheduler(
+            600, min_interval=60, max_interval=3600, backoff_base=30,
+            rand=lambda: 1.0, jitter=0
+        )
+
+    def test_success_interval(self):
+        scheduler = self.make_scheduler()
+        assert scheduler.on_success(changed=False) == 600, (
+            'Проверьте, что успешный опрос без изменений ждёт один интервал'
+        )
+        assert scheduler.on_success(changed=True) == 60, (
+            'Проверьте, что после смены статуса опрос учащается'
+        )
+        delays = [scheduler.on_success(changed=False) for _ in range(5)]
+        assert delays == [120, 240, 480, 600, 600], (
+            'Проверьте, что интервал плавно возвращается к обычному'
+        )
+
+    def test_polls_spread_over_interval(self):
+        from scheduler import PollScheduler, SeededRandom
+
+        first_delays = []
+        for index in range(100):
+            scheduler = PollScheduler(
+                600, min_interval=60, max_interval=3600, backoff_base=30,
+                rand=SeededRandom(f'token-{index}'), jitter=0.1
+            )
+            first_delays.append(scheduler.on_success(changed=False))
+            delays = [scheduler.on_success(changed=False) for _ in range(20)]
+            assert all(540 <= delay <= 660 for delay in delays)
+            assert len(set(delays)) > 1, (
+                'Проверьте, что паузы после успешного опроса с разбросом'
+            )
+        assert all(60 <= delay <= 600 for delay in first_delays)
+        halves = sum(delay < 330 for delay in first_delays)
+        assert 30 < halves < 70, (
+            'Проверьте, что подписки разных токенов расходятся по интервалу'
+        )
+        same = [
+            PollScheduler(600, rand=SeededRandom('token'))
+            .on_success(changed=False)
+            for _ in range(2)
+        ]
+        assert same[0] == same[1], (
+            'Проверьте, что подписки одного токена опрашиваются вместе'
+        )
+
+    def test_backoff(self):
+        from exceptions import ConnectionError
+
+        scheduler = self.make_scheduler()
+        delays = [
+            scheduler.on_error(ConnectionError('timeout')) for _ in range(9)
+        ]
+        assert delays == [60, 60, 120, 240, 480, 960, 1920, 3600, 3600], (
+            'Проверьте экспоненциальный рост паузы при ошибках'
+        )
+        scheduler.on_success(changed=False)
+        assert scheduler.failures == 0, (
+            'Проверьте, что успешный опрос сбрасывает счётчик ошибок'
+        )
+
+    def test_retry_after(self):
+        from exceptions import ConnectionError, WrongAPIResponseCodeError
+
+        scheduler = self.make_scheduler()
+        try:
+            try:
+                raise WrongAPIResponseCodeError(
+                    'Error 429!', status_code=429, retry_after=900
+                )
+            except WrongAPIResponseCodeError as error:
+                raise ConnectionError('Ошибка при запросе к API') from error
+        except ConnectionError as error:
+            assert scheduler.on_error(error) == 900, (
+                'Проверьте, что соблюдается заголовок Retry-After'
+            )
+
+    def test_other_errors(self):
+        scheduler = self.make_scheduler()
+        assert scheduler.on_error(TypeError('bad')) == 600, (
+            'Проверьте, что ошибки формата ответа не вызывают backoff'
+        )
+
+    def test_seeded_random(self):
+        from scheduler import SeededRandom
+
+        first, second = SeededRandom('token'), SeededRandom('token')
+        values = [first() for _ in range(100)]
+        assert values == [second() for _ in range(100)], (
+            'Проверьте, что одинаковый seed даёт одинаковый разброс пауз'
+        )
+        assert all(0 <= value < 1 for value in values)
+        assert len(set(values)) == 100
+        assert values[0] != SeededRandom('other')()
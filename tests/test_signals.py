@@ -0,0 +1,94 @@
+import asyncio
+import os
+import signal
+import time
+
+import utils
+
+
+class TestSignals:
+
+    def test_sigterm_drains_outbox(self, monkeypatch, random_timestamp):
+        import engine
+        import outbox
+
+        utils.mock_fetch(
+            monkeypatch,
+            [
+                {'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'rejected'},
+            ],
+            current_date=random_timestamp
+        )
+
+        class SlowBot(utils.MockBot):
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if not self.messages:
+                    os.kill(os.getpid(), signal.SIGTERM)
+                super().send_message(chat_id, text)
+
+        monkeypatch.setattr(outbox, 'TELEGRAM_CHAT_RATE', 100)
+        bot = SlowBot(delay=0.2)
+        polling = engine.PollingEngine(
+            bot, [engine.Subscription('token', 1)], serve_http=False
+        )
+        asyncio.run(asyncio.wait_for(polling.run(), 5))
+        assert len(bot.messages) == 2, (
+            'Проверьте, что по SIGTERM очередь отправляется до выхода'
+        )
+
+    def test_drain_deadline(self):
+        import engine
+
+        polling = engine.PollingEngine(
+            utils.MockBot(delay=1), [], serve_http=False
+        )
+
+        async def drain():
+            sender = asyncio.ensure_future(polling.outbox.run())
+            polling.outbox.put(1, 'text')
+            started = time.monotonic()
+            await polling.drain(timeout=0.1)
+            sender.cancel()
+            return time.monotonic() - started
+
+        assert asyncio.run(drain()) < 0.5, (
+            'Проверьте, что отправка очереди ограничена по времени'
+        )
+
+    def test_reload(self, monkeypatch, random_timestamp):
+        import engine
+        import homework
+
+        utils.mock_fetch(monkeypatch, current_date=random_timestamp)
+        for module, name, _ in engine.RELOADABLE_SETTINGS:
+            monkeypatch.setattr(module, name, getattr(module, name))
+        monkeypatch.setenv('RETRY_TIME', '900')
+        first, second, third = (
+            engine.Subscription(f'token{index}', index)
+            for index in range(3)
+        )
+        source = [second, third]
+        polling = engine.PollingEngine(
+            None, [first, second], subscription_source=lambda: source
+        )
+
+        async def reload():
+            for subscription in polling.subscriptions:
+                polling.new_state(subscription)
+                polling.start_polling(subscription)
+            await asyncio.sleep(0)
+            await polling.reload()
+            keys = set(polling._pollers)
+            await polling.stop_polling()
+            return keys
+
+        assert asyncio.run(reload()) == {second.key, third.key}, (
+            'Проверьте, что по SIGHUP опрос следует новому списку подписок'
+        )
+        assert first.key not in polling.states
+        assert homework.RETRY_TIME == 900
+        assert polling.states[second.key].scheduler.interval == 900, (
+            'Проверьте, что новый интервал опроса применяется без перезапуска'
+        )
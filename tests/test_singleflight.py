@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import utils
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_coalesced(self):
+        from singleflight import SingleFlight
+
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def fetch(token):
+            calls.append(token)
+            started.set()
+            time.sleep(0.1)
+            return {'token': token}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flights.do, 'key', fetch, 'token')
+            started.wait()
+            followers = [
+                executor.submit(flights.do, 'key', fetch, 'token')
+                for _ in range(3)
+            ]
+            results = [leader.result()] + [f.result() for f in followers]
+        assert calls == ['token'], (
+            'Проверьте, что одновременные одинаковые запросы схлопываются'
+        )
+        assert all(result is results[0] for result in results)
+        assert flights.stats() == {
+            'executed': 1, 'coalesced': 3, 'ratio': 0.75
+        }
+        flights.do('key', fetch, 'token')
+        assert len(calls) == 2, (
+            'Проверьте, что завершённый запрос не переиспользуется'
+        )
+
+    def test_error_shared(self):
+        from singleflight import SingleFlight
+
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def fetch():
+            started.set()
+            time.sleep(0.1)
+            raise TimeoutError('timeout')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flights.do, 'key', fetch)
+            started.wait()
+            follower = executor.submit(flights.do, 'key', fetch)
+            for future in (leader, follower):
+                with pytest.raises(TimeoutError):
+                    future.result()
+
+    def test_engine_shared_token(self, monkeypatch, random_timestamp):
+        import engine
+
+        requests = utils.mock_fetch(
+            monkeypatch, [{'homework_name': 'hw', 'status': 'approved'}],
+            current_date=random_timestamp, delay=0.1
+        )
+        bot = utils.MockBot()
+        subscriptions = [
+            engine.Subscription('token', 1),
+            engine.Subscription('token', 2),
+            engine.Subscription('other', 3),
+        ]
+        polling = engine.PollingEngine(bot, subscriptions)
+
+        async def poll():
+            sender = asyncio.ensure_future(polling.outbox.run())
+            await asyncio.gather(*(
+                polling.poll_once(subscription, polling.new_state(
+                    subscription, 0
+                ))
+                for subscription in subscriptions
+            ))
+            await polling.outbox.join()
+            sender.cancel()
+
+        asyncio.run(poll())
+        assert sorted(token for token, _ in requests) == ['other', 'token'], (
+            'Проверьте, что подписки одного токена делают один запрос'
+        )
+        assert sorted(chat_id for chat_id, _ in bot.messages) == [1, 2, 3], (
+            'Проверьте, что ответ доставляется во все чаты токена'
+        )
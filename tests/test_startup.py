@@ -0,0 +1,81 @@
+import subprocess
+import sys
+from os.path import abspath, dirname
+
+import utils
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+CHECK_TOKENS = '''
+import sys
+sys.path.insert(0, {root!r})
+import homework
+try:
+    homework.main()
+except SystemExit:
+    pass
+print(' '.join(sorted({{'requests', 'telegram'}} & set(sys.modules))))
+'''
+
+
+class TestStartup:
+
+    def test_failed_check_does_not_import_clients(self, tmp_path):
+        result = subprocess.run(
+            [sys.executable, '-c', CHECK_TOKENS.format(root=ROOT)],
+            cwd=tmp_path, env={}, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == '', (
+            'Проверьте, что при неудачной проверке токенов бот завершается, '
+            'не импортируя requests и telegram'
+        )
+
+    def test_lazy_bot_created_once(self, monkeypatch):
+        import homework
+
+        created = []
+        mock_bot = utils.MockBot()
+
+        def mock_create_bot(**kwargs):
+            created.append(kwargs)
+            return mock_bot
+
+        monkeypatch.setattr(homework, 'create_bot', mock_create_bot)
+        bot = homework.LazyBot(base_url='http://localhost')
+        assert created == [], (
+            'Проверьте, что бот не создаётся до первого обращения'
+        )
+        bot.send_message(1, 'text')
+        bot.send_message(2, 'text')
+        assert mock_bot.messages == [(1, 'text'), (2, 'text')]
+        assert created == [{'base_url': 'http://localhost'}], (
+            'Проверьте, что бот создаётся один раз при первом обращении'
+        )
+
+    def test_lazy_bot_created_off_loop(self, monkeypatch):
+        import asyncio
+        import threading
+
+        import homework
+        from outbox import OutboundQueue
+
+        threads = []
+
+        def mock_create_bot(**kwargs):
+            threads.append(threading.current_thread())
+            return utils.MockBot()
+
+        monkeypatch.setattr(homework, 'create_bot', mock_create_bot)
+        outbox = OutboundQueue(homework.LazyBot())
+
+        async def send():
+            sender = asyncio.ensure_future(outbox.run())
+            outbox.put(1, 'text')
+            await outbox.join()
+            sender.cancel()
+
+        asyncio.run(send())
+        assert threads and threads[0] is not threading.main_thread(), (
+            'Проверьте, что бот создаётся в потоке пула, а не в цикле событий'
+        )
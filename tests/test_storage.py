@@ -0,0 +1,93 @@
+import asyncio
+
+import utils
+
+
+class TestStateStore:
+
+    def test_save_and_load(self, tmp_path):
+        from storage import StateStore
+
+        store = StateStore(str(tmp_path / 'state.sqlite3'))
+        store.save([('sub1', 100)], [('sub1', 1, 'approved', 'hw1')])
+        store.save([('sub1', 200)], [('sub1', 'hw2', 'reviewing', 'hw2')])
+        store.close()
+
+        states = StateStore(str(tmp_path / 'state.sqlite3')).load()
+        assert states == {'sub1': (
+            200, {1: 'approved', 'hw2': 'reviewing'}, {1: 'hw1', 'hw2': 'hw2'}
+        )}, (
+            'Проверьте, что хранилище восстанавливает from_date, статусы '
+            'и названия работ без изменения типа id'
+        )
+
+    def test_old_schema_migrated(self, tmp_path):
+        import sqlite3
+
+        from storage import StateStore
+
+        path = str(tmp_path / 'state.sqlite3')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE statuses (key TEXT, homework, status TEXT,'
+            ' PRIMARY KEY (key, homework)) WITHOUT ROWID'
+        )
+        connection.execute(
+            "INSERT INTO statuses VALUES ('sub1', 1, 'approved')"
+        )
+        connection.commit()
+        connection.close()
+
+        store = StateStore(path)
+        assert store.load() == {'sub1': (None, {1: 'approved'}, {})}
+        store.save([], [('sub1', 1, 'approved', 'hw1')])
+        assert store.load()['sub1'][2] == {1: 'hw1'}, (
+            'Проверьте, что в старую базу добавляется столбец названий'
+        )
+
+    def test_engine_restart(self, tmp_path, monkeypatch):
+        import commands
+        import engine
+        from storage import StateStore
+
+        requested = utils.mock_fetch(
+            monkeypatch,
+            [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]
+        )
+        bot = utils.MockBot()
+        path = str(tmp_path / 'state.sqlite3')
+        subscription = engine.Subscription('token', 1)
+
+        async def poll():
+            polling = engine.PollingEngine(
+                bot, [subscription], StateStore(path)
+            )
+            await polling.restore()
+            sender = asyncio.ensure_future(polling.outbox.run())
+            state = polling.states[subscription.key]
+            await polling.poll_once(subscription, state)
+            await polling.checkpoint()
+            await polling.outbox.join()
+            sender.cancel()
+            return state.from_date
+
+        async def restore():
+            polling = engine.PollingEngine(
+                bot, [subscription], StateStore(path)
+            )
+            await polling.restore()
+            return commands.render_status([polling.states[subscription.key]])
+
+        first_from_date = asyncio.run(poll())
+        assert 'hw1: Работа проверена' in asyncio.run(restore()), (
+            'Проверьте, что названия работ восстанавливаются из хранилища'
+        )
+        asyncio.run(poll())
+        assert len(bot.messages) == 1, (
+            'Проверьте, что после перезапуска не отправляются повторные '
+            'уведомления'
+        )
+        assert requested[1][1] == first_from_date, (
+            'Проверьте, что после перезапуска опрос продолжается '
+            'с сохранённого from_date'
+        )
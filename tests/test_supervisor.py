@@ -0,0 +1,100 @@
+class TestHashRing:
+
+    def test_adding_worker_moves_few_subscriptions(self):
+        from supervisor import HashRing
+
+        keys = [f'subscription{index}' for index in range(10000)]
+        ring = HashRing(range(4))
+        before = {key: ring.get(key) for key in keys}
+        ring.add(4)
+        moved = [key for key in keys if ring.get(key) != before[key]]
+        assert all(ring.get(key) == 4 for key in moved), (
+            'Проверьте, что подписки переезжают только на новый процесс'
+        )
+        assert 0.1 < len(moved) / len(keys) < 0.3, (
+            'Проверьте, что при добавлении процесса переезжает около 1/N '
+            'подписок'
+        )
+
+    def test_removing_worker(self):
+        from supervisor import HashRing
+
+        keys = [f'subscription{index}' for index in range(1000)]
+        ring = HashRing(range(3))
+        before = {key: ring.get(key) for key in keys}
+        ring.remove(1)
+        for key in keys:
+            if before[key] != 1:
+                assert ring.get(key) == before[key], (
+                    'Проверьте, что подписки оставшихся процессов '
+                    'не переезжают'
+                )
+
+    def test_same_token_in_one_shard(self):
+        from engine import Subscription
+        from supervisor import HashRing, assign
+
+        subscriptions = [
+            Subscription(f'token-{index % 5}', index) for index in range(50)
+        ]
+        shards = assign(subscriptions, HashRing(range(4)))
+        tokens = [
+            {subscription.token_key for subscription in shard}
+            for shard in shards.values()
+        ]
+        assert sum(map(len, tokens)) == 5, (
+            'Проверьте, что подписки одного токена не делятся по процессам'
+        )
+
+    def test_merge_metrics(self):
+        import metrics
+
+        registry = metrics.Registry()
+        counter = registry.register(metrics.Counter('c', 'C.'))
+        gauge = registry.register(metrics.Gauge('g', 'G.', aggregate='max'))
+        histogram = registry.register(
+            metrics.Histogram('h', 'H.', buckets=(1,))
+        )
+        registry.merge([
+            {'c': {(): 2}, 'g': {(): 5}, 'h': {(): [1, 0, 0.5, 1]}},
+            {'c': {(): 3}, 'g': {(): 7}, 'h': {(): [0, 1, 3.0, 1]}},
+        ])
+        assert counter.values == {(): 5}
+        assert gauge.values == {(): 7}
+        assert histogram.values == {(): [1, 1, 3.5, 2]}
+
+    def test_inbox_reader_stops(self, monkeypatch):
+        import asyncio
+        import multiprocessing
+        import time
+
+        import supervisor
+
+        monkeypatch.setattr(supervisor, 'INBOX_POLL_INTERVAL', 0.1)
+        inbox = multiprocessing.Queue()
+
+        async def read():
+            reader = asyncio.ensure_future(supervisor._read_inbox(None, inbox))
+            await asyncio.sleep(0.05)
+            reader.cancel()
+
+        started = time.monotonic()
+        asyncio.run(read())
+        assert time.monotonic() - started < 1, (
+            'Проверьте, что чтение очереди воркера не мешает ему завершиться'
+        )
+
+    def test_hung_process_killed(self):
+        import multiprocessing
+        import time
+
+        import supervisor
+
+        process = multiprocessing.get_context('spawn').Process(
+            target=time.sleep, args=(60,)
+        )
+        process.start()
+        supervisor.join_process(process, timeout=0.1)
+        assert not process.is_alive(), (
+            'Проверьте, что зависший процесс завершается принудительно'
+        )
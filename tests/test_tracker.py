@@ -0,0 +1,54 @@
+class TestHomeworkTracker:
+
+    def test_changes_whole_list(self):
+        from tracker import HomeworkTracker
+
+        tracker = HomeworkTracker()
+        homeworks = [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+        ]
+        changes = tracker.changes(homeworks)
+        assert changes == homeworks, (
+            'Проверьте, что учитываются все работы из ответа API, '
+            'а не только первая'
+        )
+        for homework in changes:
+            tracker.update(homework)
+        assert tracker.changes(homeworks) == [], (
+            'Проверьте, что работы без изменения статуса не возвращаются'
+        )
+
+    def test_changes_only_transitions(self):
+        from tracker import HomeworkTracker
+
+        tracker = HomeworkTracker({1: 'reviewing', 2: 'reviewing'})
+        changes = tracker.changes([
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+        ])
+        assert [homework['id'] for homework in changes] == [2], (
+            'Проверьте, что возвращаются только реальные смены статуса'
+        )
+
+    def test_key_without_id(self):
+        from tracker import HomeworkTracker
+
+        tracker = HomeworkTracker()
+        homework = {'homework_name': 'hw1', 'status': 'approved'}
+        tracker.update(homework)
+        assert tracker.changes([homework]) == [], (
+            'Проверьте, что работа без `id` отслеживается по названию'
+        )
+
+    def test_statuses_interned(self):
+        import json
+
+        from tracker import HomeworkTracker
+
+        first = HomeworkTracker({1: json.loads('"approved"')})
+        second = HomeworkTracker()
+        second.update({'id': 2, 'status': json.loads('"approved"')})
+        assert first.statuses[1] is second.statuses[2], (
+            'Проверьте, что подписки хранят общие объекты строк статусов'
+        )
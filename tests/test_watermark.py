@@ -0,0 +1,97 @@
+import pytest
+
+
+def date_updated(timestamp):
+    from datetime import datetime, timezone
+
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        '%Y-%m-%dT%H:%M:%SZ'
+    )
+
+
+class MockAPI:
+    """API со своими часами: работа видна в ответе с задержкой lag."""
+
+    def __init__(self, events, lag=0):
+        self.events = events
+        self.lag = lag
+
+    def response(self, now, from_date):
+        homeworks = [
+            {'id': homework_id, 'status': status,
+             'date_updated': date_updated(updated)}
+            for updated, homework_id, status in self.events
+            if updated + self.lag <= now and updated >= from_date
+        ]
+        return {'homeworks': homeworks, 'current_date': now}
+
+
+class TestWatermark:
+
+    def test_parse_date_updated(self):
+        from watermark import parse_date_updated
+
+        assert parse_date_updated('2022-02-13T14:40:57Z') == 1644763257
+        assert parse_date_updated('13.02.2022') is None
+        assert parse_date_updated(None) is None
+
+    def test_window_from_server_time(self):
+        from watermark import next_from_date
+
+        assert next_from_date(100, 1000, [], overlap=60) == 940
+        assert next_from_date(100, True, [], overlap=60) == 100, (
+            'Проверьте, что некорректный current_date не сдвигает окно'
+        )
+
+    def test_missing_current_date(self):
+        from watermark import next_from_date
+
+        homeworks = [
+            {'id': 1, 'date_updated': date_updated(1000)},
+            {'id': 2, 'date_updated': date_updated(5000)},
+            {'id': 3, 'date_updated': 'нет даты'},
+        ]
+        assert next_from_date(900, None, homeworks, overlap=60) == 4940, (
+            'Проверьте, что без current_date окно сдвигается по date_updated'
+        )
+        assert next_from_date(900, None, [], overlap=60) == 900, (
+            'Проверьте, что без current_date и работ окно не сдвигается'
+        )
+
+    @pytest.mark.parametrize('skew', [-3600, -30, 0, 30, 3600])
+    def test_clock_skew_loses_no_transitions(self, monkeypatch, skew):
+        import time
+
+        from tracker import HomeworkTracker
+        from watermark import initial_from_date, next_from_date
+
+        server_started = 1_644_000_000
+        events = [
+            (server_started + 5, 1, 'reviewing'),
+            (server_started + 290, 1, 'rejected'),
+            (server_started + 300, 2, 'reviewing'),
+            (server_started + 599, 2, 'approved'),
+            (server_started + 601, 1, 'approved'),
+        ]
+        api = MockAPI(events, lag=20)
+        monkeypatch.setattr(time, 'time', lambda: server_started + skew)
+        from_date = initial_from_date(time.time(), 60)
+        tracker = HomeworkTracker()
+        seen = []
+        for now in range(server_started, server_started + 1000, 100):
+            response = api.response(now, from_date)
+            assert len(response['homeworks']) <= 2, (
+                'Проверьте, что окно запроса не растёт'
+            )
+            for changed in tracker.changes(response['homeworks']):
+                tracker.update(changed)
+                seen.append((changed['id'], changed['status']))
+            from_date = next_from_date(
+                from_date, response['current_date'], response['homeworks'], 60
+            )
+        assert seen == [
+            (homework_id, status) for _, homework_id, status in events
+        ], (
+            'Проверьте, что при расхождении часов бота и API не теряются '
+            'и не повторяются смены статуса'
+        )
@@ -1,3 +1,5 @@
+import json
+import time
 from inspect import signature
 from types import ModuleType
 
@@ -37,3 +39,78 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class MockAPIResponse:
+    """Ответ API Практикума для подмены `homework.fetch_api_response`."""
+
+    def __init__(self, data: dict, status_code: int = 200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode()
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class MockBot:
+    """Бот Telegram, запоминающий отправленные сообщения.
+
+    errors — исключения, которые по очереди выбрасывают первые отправки,
+    updates — обновления для get_updates, delay — длительность отправки.
+    """
+
+    def __init__(self, errors=(), updates=(), delay=0):
+        self.errors = list(errors)
+        self.updates = list(updates)
+        self.delay = delay
+        self.messages = []
+
+    @property
+    def texts(self):
+        return [text for _, text in self.messages]
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.messages.append((chat_id, text))
+
+    def get_updates(self, offset=None, limit=100, timeout=0):
+        updates, self.updates = self.updates, []
+        return updates
+
+
+def mock_fetch(monkeypatch, homeworks=(), current_date=None, delay=0):
+    """Подменяет `homework.fetch_api_response` ответом с работами.
+
+    homeworks — список работ или функция (token, from_date), которая
+    возвращает его или выбрасывает ошибку запроса. current_date по
+    умолчанию на секунду позже from_date. Возвращает список запросов
+    (token, from_date).
+    """
+    import homework
+
+    requests = []
+
+    def mock_fetch_api_response(token, current_timestamp, headers=None):
+        requests.append((token, current_timestamp))
+        if delay:
+            time.sleep(delay)
+        works = (
+            homeworks(token, current_timestamp) if callable(homeworks)
+            else homeworks
+        )
+        return MockAPIResponse({
+            'homeworks': list(works),
+            'current_date': (
+                current_timestamp + 1 if current_date is None
+                else current_date
+            )
+        })
+
+    monkeypatch.setattr(
+        homework, 'fetch_api_response', mock_fetch_api_response
+    )
+    return requests
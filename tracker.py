@@ -0,0 +1,110 @@
+import sys
+
+
+def intern_status(status):
+    """Возвращает общий для всех подписок объект строки статуса.
+
+    Статусы из JSON и из SQLite каждый раз новые строки, а различных
+    статусов всего несколько.
+    """
+    return sys.intern(status) if isinstance(status, str) else status
+
+
+def homework_key(homework: dict):
+    """Возвращает ключ работы: id, а при его отсутствии — название."""
+    return homework.get('id', homework.get('homework_name'))
+
+
+class HomeworkTracker:
+    """Хранит последний известный статус каждой домашней работы.
+
+    Названия работ хранятся рядом со статусами для /status. Словарь
+    названий создаётся только когда есть что хранить, а название, равное
+    ключу работы, не хранится. Так же лениво хранится `date_updated`
+    последнего учтённого статуса, чтобы отбрасывать устаревшие события.
+    """
+
+    __slots__ = ('statuses', 'names', 'updated', '_dirty')
+
+    def __init__(self, statuses: dict = None, names: dict = None) -> None:
+        self.statuses: dict = {
+            key: intern_status(status)
+            for key, status in (statuses or {}).items()
+        }
+        self.names = None
+        for key, name in (names or {}).items():
+            self.set_name(key, name)
+        self.updated = None
+        # Словарь изменений создаётся только при первом изменении.
+        self._dirty = None
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def changes(self, homeworks: list) -> list:
+        """Возвращает работы, статус которых отличается от известного.
+
+        Проходит список из ответа API один раз, поэтому стоимость цикла
+        зависит только от числа работ в окне `from_date`, а не от всей
+        истории студента.
+        """
+        statuses = self.statuses
+        return [
+            homework for homework in homeworks
+            if statuses.get(homework_key(homework)) != homework.get('status')
+        ]
+
+    def update(self, homework: dict) -> None:
+        """Запоминает статус и название работы после обработки перехода."""
+        key = homework_key(homework)
+        self.set_name(key, homework.get('homework_name'))
+        self.set_status(key, homework.get('status'))
+        updated = homework.get('date_updated')
+        if updated is not None:
+            if self.updated is None:
+                self.updated = {}
+            self.updated[key] = updated
+
+    def is_stale(self, homework: dict) -> bool:
+        """Проверяет, что работа обновлена раньше последнего статуса.
+
+        API отдаёт `date_updated` в ISO 8601 с одной и той же точностью,
+        поэтому строки сравниваются напрямую.
+        """
+        updated = homework.get('date_updated')
+        if updated is None or self.updated is None:
+            return False
+        last = self.updated.get(homework_key(homework))
+        return last is not None and updated < last
+
+    def set_name(self, key, name) -> None:
+        """Запоминает название работы по её ключу."""
+        if name is None or name == key:
+            return
+        if self.names is None:
+            self.names = {}
+        # Подписки одного токена получают одни и те же названия.
+        self.names[key] = sys.intern(name) if isinstance(name, str) else name
+
+    def name(self, key):
+        """Название работы или её ключ, если название неизвестно."""
+        if self.names is None:
+            return key
+        return self.names.get(key, key)
+
+    def set_status(self, key, status: str) -> None:
+        """Запоминает статус работы по её ключу."""
+        status = intern_status(status)
+        self.statuses[key] = status
+        if self._dirty is None:
+            self._dirty = {}
+        self._dirty[key] = status
+
+    def pop_dirty(self) -> dict:
+        """Возвращает статусы, изменившиеся с прошлого вызова."""
+        dirty, self._dirty = self._dirty, None
+        return dirty or {}
+
+    def mark_dirty(self, dirty: dict) -> None:
+        """Возвращает статусы, которые не удалось сохранить."""
+        self._dirty = {**dirty, **(self._dirty or {})}
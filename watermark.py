@@ -0,0 +1,67 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_OVERLAP = int(os.getenv('WATERMARK_OVERLAP', 60))
+
+
+def parse_date_updated(value) -> Optional[int]:
+    """Переводит date_updated вида 2022-02-13T14:40:57Z в unix-время."""
+    if not isinstance(value, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def valid_timestamp(value) -> Optional[int]:
+    """Возвращает current_date из ответа API, если это разумное число."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value) if value > 0 else None
+
+
+def initial_from_date(now: float, overlap: int = WATERMARK_OVERLAP) -> int:
+    """from_date первого запроса: часы бота могут спешить."""
+    return max(int(now) - overlap, 0)
+
+
+def next_from_date(from_date: int, current_date, homeworks: list,
+                   overlap: int = WATERMARK_OVERLAP) -> int:
+    """Вычисляет from_date следующего запроса по ответу API.
+
+    Окно сдвигается только по времени сервера: по current_date, а если его
+    нет в ответе — по самому позднему date_updated из полученных работ.
+    Часы бота не используются, поэтому расхождение времени бота и API не
+    приводит к пропуску событий. Перекрытие overlap повторно захватывает
+    работы, обновлённые у границы окна; повторы отсекает HomeworkTracker.
+    Если ни одной отметки времени сервера нет, окно не сдвигается.
+    """
+    mark = valid_timestamp(current_date)
+    if mark is None:
+        dates = [
+            date for date in (
+                parse_date_updated(homework.get('date_updated'))
+                for homework in homeworks
+            ) if date is not None
+        ]
+        if not dates:
+            logger.warning(
+                'В ответе API нет current_date, from_date не изменён'
+            )
+            return from_date
+        logger.warning(
+            'В ответе API нет current_date, from_date взят из date_updated'
+        )
+        # Все полученные работы обновлены не раньше from_date, так что
+        # окно можно не отодвигать назад.
+        return max(max(dates) - overlap, from_date)
+    return max(mark - overlap, 0)
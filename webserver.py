@@ -0,0 +1,102 @@
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class Endpoint:
+    """Локальный HTTP-сервер с таблицей маршрутов.
+
+    Обработчик маршрута принимает словарь параметров запроса, тело
+    и заголовки и возвращает кортеж (код, Content-Type, тело).
+    Сервер работает в отдельном потоке и не зависит от цикла событий.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.routes: dict = {}
+        self._server = None
+
+    def route(self, method: str, path: str, handler) -> None:
+        """Регистрирует обработчик для метода и пути."""
+        self.routes[(method, path)] = handler
+
+    def _handler_class(self):
+        routes = self.routes
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def _dispatch(self, method: str) -> None:
+                url = urlsplit(self.path)
+                handler = routes.get((method, url.path))
+                if handler is None:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > MAX_BODY_SIZE:
+                    self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                    return
+                body = self.rfile.read(length) if length else b''
+                try:
+                    status, content_type, payload = handler(
+                        parse_qs(url.query), body, self.headers
+                    )
+                except Exception as error:
+                    logger.error(error, exc_info=True)
+                    self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR)
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        return Handler
+
+    def start(self) -> None:
+        """Запускает сервер в фоновом потоке."""
+        if self._server is not None:
+            return
+        self._server = ThreadingHTTPServer(
+            (self.host, self.port), self._handler_class()
+        )
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever,
+            name=f'http-{self.port}', daemon=True
+        ).start()
+        logger.info('HTTP-сервер слушает %s:%s', self.host, self.port)
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_ENDPOINTS: dict = {}
+
+
+def get_endpoint(host: str, port: int) -> Endpoint:
+    """Возвращает общий сервер для адреса, чтобы маршруты делили порт."""
+    key = (host, int(port))
+    if key not in _ENDPOINTS:
+        _ENDPOINTS[key] = Endpoint(host, int(port))
+    return _ENDPOINTS[key]